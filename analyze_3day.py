@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 
-import json
+from cases import as_public_cases, load_columns
 
 def analyze_3day_trips():
-    with open('trip_duration_datasets/trip_duration_3_days.json', 'r') as f:
-        data = json.load(f)
+    data = as_public_cases(load_columns('trip_duration_datasets/trip_duration_3_days.json'))
     
     print("3-Day Trip Analysis:")
     print("=" * 80)
@@ -1,20 +1,20 @@
 #!/usr/bin/env python3
 
-import json
+import argparse
+from cases import as_public_cases
+from segments import DEFAULT_SAMPLES_PER_DURATION, DEFAULT_SEED, SEGMENTS, load_segment_index, named_segment, stratified_sample
 
-def analyze_7plus_day_trips():
-    # Load data for 7+ day trips (7, 8, 9, 10, 11, 12, 13, 14 days)
-    all_data = []
-    
-    for days in range(7, 15):  # 7 through 14 days
-        try:
-            with open(f'trip_duration_datasets/trip_duration_{days}_days.json', 'r') as f:
-                data = json.load(f)
-                for case in data:
-                    case['trip_days'] = days  # Add trip duration for analysis
-                    all_data.append(case)
-        except FileNotFoundError:
-            print(f"No data file found for {days}-day trips")
+def analyze_7plus_day_trips(full=False, samples_per_duration=DEFAULT_SAMPLES_PER_DURATION, seed=DEFAULT_SEED):
+    # Load 7+ day trips (7 through 14 days) from the public cases: a seeded sample of each duration, or all of them
+    index = load_segment_index('public_cases.json')
+    if full:
+        columns = named_segment(index, '7+')
+    else:
+        columns = stratified_sample(index, samples_per_duration, seed, *SEGMENTS['7+'])
+    
+    all_data = as_public_cases(columns)
+    for case in all_data:
+        case['trip_days'] = case['input']['trip_duration_days']  # Add trip duration for analysis
     
     print("7+ Day Trip Analysis:")
     print("=" * 100)
@@ -231,4 +231,11 @@ def analyze_7plus_day_trips():
         print(f"Case {i:2}: {days}d, Miles={miles:6.1f}, Receipts=${receipts:7.2f}, Expected=${expected:7.2f}, Predicted=${predicted:7.2f}, Error=${error:6.2f}")
 
 if __name__ == "__main__":
-    analyze_7plus_day_trips() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyze 7+ day trips")
+    parser.add_argument('--full', action='store_true', help="Analyze every public 7+ day case instead of a sample")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES_PER_DURATION,
+                        help=f"Cases sampled per trip duration (default: {DEFAULT_SAMPLES_PER_DURATION})")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f"Sampling seed (default: {DEFAULT_SEED})")
+    args = parser.parse_args()
+    
+    analyze_7plus_day_trips(args.full, args.samples, args.seed) 
\ No newline at end of file
@@ -1,20 +1,20 @@
 #!/usr/bin/env python3
 
-import json
+import argparse
+from cases import as_public_cases
+from segments import DEFAULT_SAMPLES_PER_DURATION, DEFAULT_SEED, SEGMENTS, load_segment_index, named_segment, stratified_sample
 
-def analyze_7plus_detailed():
-    # Load data for 7+ day trips
-    all_data = []
-    
-    for days in range(7, 15):  # 7 through 14 days
-        try:
-            with open(f'trip_duration_datasets/trip_duration_{days}_days.json', 'r') as f:
-                data = json.load(f)
-                for case in data:
-                    case['trip_days'] = days
-                    all_data.append(case)
-        except FileNotFoundError:
-            print(f"No data file found for {days}-day trips")
+def analyze_7plus_detailed(full=False, samples_per_duration=DEFAULT_SAMPLES_PER_DURATION, seed=DEFAULT_SEED):
+    # Load 7+ day trips from the public cases: a seeded sample of each duration, or all of them
+    index = load_segment_index('public_cases.json')
+    if full:
+        columns = named_segment(index, '7+')
+    else:
+        columns = stratified_sample(index, samples_per_duration, seed, *SEGMENTS['7+'])
+    
+    all_data = as_public_cases(columns)
+    for case in all_data:
+        case['trip_days'] = case['input']['trip_duration_days']
     
     print("Detailed 7+ Day Trip Analysis:")
     print("=" * 80)
@@ -200,4 +200,11 @@ def analyze_7plus_detailed():
         print(f"    Old Error=${old_error:6.2f}, New Error=${new_error:6.2f}, Improvement=${improvement:6.2f}")
 
 if __name__ == "__main__":
-    analyze_7plus_detailed() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Detailed analysis of 7+ day trips")
+    parser.add_argument('--full', action='store_true', help="Analyze every public 7+ day case instead of a sample")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES_PER_DURATION,
+                        help=f"Cases sampled per trip duration (default: {DEFAULT_SAMPLES_PER_DURATION})")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f"Sampling seed (default: {DEFAULT_SEED})")
+    args = parser.parse_args()
+    
+    analyze_7plus_detailed(args.full, args.samples, args.seed) 
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import pickle
+import sys
+import time
+import pandas as pd
+import xgboost_solution
+from expected_outputs import load_cases
+from tree_ensemble import trees_path
+from xgboost_solution import BINNED_FEATURES, create_features, load_model_data, predict_single
+
+# sklearn wrappers keyed by model path, loaded once like load_model_data's cache
+_sklearn_models = {}
+
+def load_sklearn_model(model_path=None):
+    """The XGBRegressor wrapper that predict_single used before it went pandas-free"""
+    import xgboost as xgb
+    model_path = model_path or xgboost_solution.default_model_path()
+    if model_path not in _sklearn_models:
+        if model_path.endswith('.pkl'):
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)['model']
+        else:
+            model = xgb.XGBRegressor()
+            model.load_model(model_path)
+        _sklearn_models[model_path] = model
+    return _sklearn_models[model_path]
+
+def dataframe_features(model_data, input_df):
+    """create_features on the DataFrame, reindexed to the model's columns as the old predict_single did.
+
+    For models with a feature spec the bin columns are re-cut with pd.cut on the frozen
+    training edges (out-of-range values go to the end bins), so both paths see the same features.
+    """
+    features = create_features(input_df)
+    spec = model_data.get('feature_spec')
+    if spec is not None and spec['bin_edges'] is not None:
+        for name, (column, _) in BINNED_FEATURES.items():
+            edges = spec['bin_edges'][name]
+            features[name] = pd.cut(features[column].clip(edges[0], edges[-1]), bins=edges,
+                                    labels=False, include_lowest=True)
+    return features.reindex(columns=model_data['feature_names'], fill_value=0)
+
+def predict_single_dataframe(days, miles, receipts, model_path=None):
+    """The previous predict_single: one-row DataFrame, create_features and the sklearn wrapper's predict"""
+    model_data = load_model_data(model_path, compiled=False)
+    input_df = pd.DataFrame({
+        'trip_duration_days': [days],
+        'miles_traveled': [miles],
+        'total_receipts_amount': [receipts]
+    })
+    features = dataframe_features(model_data, input_df)
+    return round(load_sklearn_model(model_path).predict(features)[0], 2)
+
+def time_model_load(model_path, compiled=True):
+    """Seconds for an uncached load_model_data of model_path"""
+    xgboost_solution._model_cache.clear()
+    start = time.perf_counter()
+    load_model_data(model_path, compiled)
+    elapsed = time.perf_counter() - start
+    xgboost_solution._model_cache.clear()
+    return elapsed
+
+def load_all_cases(filenames):
+    """(days, miles, receipts) tuples from every dataset file"""
+    cases = []
+    for filename in filenames:
+        inputs, _ = load_cases(filename)
+        cases.extend((case['trip_duration_days'], case['miles_traveled'], case['total_receipts_amount'])
+                     for case in inputs)
+    return cases
+
+def time_per_call(predict, cases, calls):
+    """Average seconds per call over `calls` predictions, cycling through cases"""
+    predict(*cases[0])  # load the model outside the timed loop
+    start = time.perf_counter()
+    for i in range(calls):
+        predict(*cases[i % len(cases)])
+    return (time.perf_counter() - start) / calls
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare predict_single against the DataFrame prediction path")
+    parser.add_argument('--calls', type=int, default=2000, help="Timed calls per path (default: 2000)")
+    parser.add_argument('files', nargs='*', default=['public_cases.json', 'private_cases.json'],
+                        help="Case files checked for identical output (default: public and private cases)")
+    args = parser.parse_args()
+
+    print("📦 Model load time (uncached):")
+    load_model_data(compiled=False)  # import xgboost before timing
+    load_sklearn_model()
+    if os.path.exists(trees_path(xgboost_solution.MODEL_PATH)):
+        print(f"  {'compiled trees':<20} {time_model_load(xgboost_solution.MODEL_PATH) * 1000:8.1f} ms")
+    for model_path in (xgboost_solution.MODEL_PATH, xgboost_solution.LEGACY_MODEL_PATH):
+        if os.path.exists(model_path):
+            print(f"  {model_path:<20} {time_model_load(model_path, compiled=False) * 1000:8.1f} ms")
+
+    cases = load_all_cases(args.files)
+    print()
+    print(f"🔍 Checking identical output on {len(cases)} cases...")
+    mismatches = 0
+    for case in cases:
+        expected = str(predict_single_dataframe(*case))
+        actual = str(predict_single(*case))
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  Mismatch for {case}: DataFrame path {expected}, fast path {actual}")
+    if mismatches:
+        print(f"❌ {mismatches} of {len(cases)} predictions differ")
+        sys.exit(1)
+    print("✅ All predictions identical")
+
+    print(f"\n⏱️  Per-call latency over {args.calls} calls:")
+    before = time_per_call(predict_single_dataframe, cases, args.calls)
+    after = time_per_call(predict_single, cases, args.calls)
+    print(f"  DataFrame path: {before * 1e6:8.1f} µs")
+    print(f"  Fast path:      {after * 1e6:8.1f} µs")
+    print(f"  Speedup:        {before / after:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+# Typed NumPy columns for the case files (public_cases.json, private_cases.json and
+# trip_duration_datasets/*.json). A file is parsed once; later loads memory-map .npy
+# files cached under its content hash.
+
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cases_cache')
+
+# Column dtypes. Miles are hundredths of a mile and receipts are cents, so fractional
+# private-case miles stay exact (float32 cannot hold values like 344.46).
+COLUMNS = {
+    'days': np.int16,
+    'miles_hundredths': np.int32,
+    'receipt_cents': np.int64,
+    'expected': np.float64
+}
+
+def source_sha256(filename):
+    """Content hash of a case file"""
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def hundredths(values, name, filename):
+    """Exact integer hundredths of a list of numbers; raises ValueError for finer precision"""
+    values = np.asarray(values, dtype=np.float64)
+    scaled = np.round(values * 100).astype(np.int64)
+    if not np.array_equal(scaled / 100, values):
+        raise ValueError(f"{filename}: {name} has values with more than two decimal places")
+    return scaled
+
+def parse_columns(filename):
+    """Parse a public-format (input + expected_output) or private-format case file into columns"""
+    with open(filename, 'r') as f:
+        data = json.load(f)
+    inputs = [case.get('input', case) for case in data]
+    columns = {
+        'days': np.array([case['trip_duration_days'] for case in inputs], dtype=COLUMNS['days']),
+        'miles_hundredths': hundredths([case['miles_traveled'] for case in inputs], 'miles_traveled', filename),
+        'receipt_cents': hundredths([case['total_receipts_amount'] for case in inputs], 'total_receipts_amount', filename),
+        'expected': None
+    }
+    if data and 'expected_output' in data[0]:
+        columns['expected'] = np.array([case['expected_output'] for case in data], dtype=COLUMNS['expected'])
+    return {name: None if values is None else values.astype(COLUMNS[name]) for name, values in columns.items()}
+
+def cache_files(digest, cache_dir=CACHE_DIR):
+    """Cached .npy file per column for a source file hash"""
+    return {name: os.path.join(cache_dir, f"{digest}.{name}.npy") for name in COLUMNS}
+
+def load_columns(filename, cache_dir=CACHE_DIR):
+    """Columns of a case file, memory-mapped from the cache (parsed and cached on first use).
+
+    'expected' is None for private-format files without outputs.
+    """
+    digest = source_sha256(filename)
+    files = cache_files(digest, cache_dir)
+    missing = os.path.join(cache_dir, f"{digest}.no_expected")
+    if all(os.path.exists(path) for name, path in files.items() if name != 'expected') and \
+            (os.path.exists(files['expected']) or os.path.exists(missing)):
+        return {name: np.load(path, mmap_mode='r') if os.path.exists(path) else None for name, path in files.items()}
+
+    columns = parse_columns(filename)
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, values in columns.items():
+        if values is None:
+            open(missing, 'w').close()
+            continue
+        # Write to a temporary file first so concurrent loads never map a partial column
+        tmp_path = f"{files[name]}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, values)
+        os.replace(tmp_path, files[name])
+    return columns
+
+def miles(columns):
+    """Miles traveled as float64"""
+    return columns['miles_hundredths'] / 100
+
+def receipts(columns):
+    """Total receipts amount in dollars as float64"""
+    return columns['receipt_cents'] / 100
+
+def json_number(value):
+    """A float as the JSON files store it: integral values as int (like stream_io.parse_case's miles)"""
+    return int(value) if value.is_integer() else value
+
+def as_inputs(columns):
+    """Case inputs as dicts in the JSON files' format"""
+    return [
+        {
+            'trip_duration_days': days,
+            'miles_traveled': json_number(mile),
+            'total_receipts_amount': json_number(receipt)
+        }
+        for days, mile, receipt in zip(columns['days'].tolist(), miles(columns).tolist(), receipts(columns).tolist())
+    ]
+
+def expected_outputs(columns):
+    """Expected outputs in the JSON files' format, or None for private-format files"""
+    if columns['expected'] is None:
+        return None
+    return [json_number(expected) for expected in columns['expected'].tolist()]
+
+def as_public_cases(columns):
+    """Cases as public-format dicts ({'input': ..., 'expected_output': ...})"""
+    return [
+        {'input': case, 'expected_output': expected}
+        for case, expected in zip(as_inputs(columns), expected_outputs(columns))
+    ]
+
+def as_records(columns):
+    """Cases as flat {'days', 'miles', 'receipts', 'expected'} dicts, as the optimizer scripts use them"""
+    return [
+        {
+            'days': case['trip_duration_days'],
+            'miles': case['miles_traveled'],
+            'receipts': case['total_receipts_amount'],
+            'expected': expected
+        }
+        for case, expected in zip(as_inputs(columns), expected_outputs(columns))
+    ]
+
+def main():
+    # Parse and cache case files ahead of time: python3 cases.py [file ...]
+    filenames = sys.argv[1:] or ['public_cases.json', 'private_cases.json']
+    for filename in filenames:
+        columns = load_columns(filename)
+        size = sum(values.nbytes for values in columns.values() if values is not None)
+        print(f"✅ {filename}: {len(columns['days'])} cases, {size} bytes of columns")
+
+if __name__ == "__main__":
+    main()
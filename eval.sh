@@ -42,6 +42,13 @@ if ! command -v bc &> /dev/null; then
     exit 1
 fi
 
+# Check if python3 is available for the parallel runner
+if ! command -v python3 &> /dev/null; then
+    echo "❌ Error: python3 is required but not installed!"
+    echo "It is used to run test cases in parallel (parallel_runner.py)."
+    exit 1
+fi
+
 # Check if run.sh exists
 if [ ! -f "run.sh" ]; then
     echo "❌ Error: run.sh not found!"
@@ -68,22 +75,9 @@ if [ "$has_input_field" = "true" ]; then
     test_data=$(jq -r '.[] | "\(.input.trip_duration_days):\(.input.miles_traveled):\(.input.total_receipts_amount):\(.expected_output)"' "$DATASET_FILE")
 else
     # Private cases format - need to calculate expected output using reimbursement.py
+    # (one process computes every row and emits the same colon-separated test data)
     echo "⚙️  Calculating expected outputs using reimbursement.py..."
-    test_data=""
-    while IFS= read -r line; do
-        trip_duration=$(echo "$line" | jq -r '.trip_duration_days')
-        miles_traveled=$(echo "$line" | jq -r '.miles_traveled')
-        receipts_amount=$(echo "$line" | jq -r '.total_receipts_amount')
-        
-        # Calculate expected output using Python
-        expected=$(python3 -c "
-from reimbursement import calculate_reimbursement
-result = calculate_reimbursement($trip_duration, $miles_traveled, $receipts_amount)
-print(result)
-")
-        
-        test_data="${test_data}${trip_duration}:${miles_traveled}:${receipts_amount}:${expected}"$'\n'
-    done < <(jq -c '.[]' "$DATASET_FILE")
+    test_data=$(python3 expected_outputs.py "$DATASET_FILE")
 fi
 
 # Convert to arrays for faster access (compatible with bash 3.2+)
@@ -95,6 +89,14 @@ while IFS= read -r line; do
 done <<< "$test_data"
 num_cases=${#test_cases[@]}
 
+# Run all cases through run.sh concurrently (RUN_JOBS slots, default: core count).
+# Each result line holds status, stdout and stderr of a single execution, in input order.
+echo "🚀 Running run.sh on $num_cases cases in parallel..." >&2
+run_results=()
+while IFS= read -r line; do
+    run_results+=("$line")
+done < <(printf '%s\n' "${test_cases[@]}" | python3 parallel_runner.py --script ./run.sh ${RUN_JOBS:+--jobs "$RUN_JOBS"})
+
 # Initialize counters and arrays
 successful_runs=0
 exact_matches=0
@@ -114,10 +116,10 @@ for ((i=0; i<num_cases; i++)); do
     # Extract test case data from pre-loaded array
     IFS=':' read -r trip_duration miles_traveled receipts_amount expected <<< "${test_cases[i]}"
     
-    # Run the user's implementation
-    if script_output=$(./run.sh "$trip_duration" "$miles_traveled" "$receipts_amount" 2>/dev/null); then
+    # Look up the result of the user's implementation
+    IFS=$'\x1f' read -r run_status output error_msg <<< "${run_results[i]}"
+    if [ "$run_status" = "ok" ]; then
         # Check if output is a valid number
-        output=$(echo "$script_output" | tr -d '[:space:]')
         if [[ $output =~ ^-?[0-9]+\.?[0-9]*$ ]]; then
             actual="$output"
             
@@ -152,8 +154,6 @@ for ((i=0; i<num_cases; i++)); do
             errors_array+=("Case $((i+1)): Invalid output format: $output")
         fi
     else
-        # Capture stderr for error reporting
-        error_msg=$(./run.sh "$trip_duration" "$miles_traveled" "$receipts_amount" 2>&1 >/dev/null | tr -d '\n')
         errors_array+=("Case $((i+1)): Script failed with error: $error_msg")
     fi
 done
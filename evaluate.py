@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib
+import os
+import sys
+from decimal import ROUND_DOWN, Decimal
+import numpy as np
+import cases
+from expected_outputs import compute_expected
+
+# Errors are compared in integer micro-dollars so that the exact/close checks
+# behave like eval.sh's decimal bc arithmetic instead of binary floats.
+UNITS_PER_DOLLAR = 10**6
+EXACT_UNITS = UNITS_PER_DOLLAR // 100
+CLOSE_UNITS = UNITS_PER_DOLLAR
+
+# Predictors used when --predictor is not given
+DEFAULT_PREDICTOR = 'reimbursement:calculate_reimbursement'
+DEFAULT_BATCH_PREDICTOR = 'reimbursement:calculate_reimbursement_batch'
+
+def load_predictor(spec):
+    """Import a predictor given as 'module:function' (function defaults to calculate_reimbursement)"""
+    module_name, _, func_name = spec.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name or 'calculate_reimbursement')
+
+def load_dataset(filename):
+    """Load a public or private format dataset into NumPy columns.
+
+    Private format files have no expected outputs, so they are computed with
+    reimbursement.calculate_reimbursement exactly like eval.sh does.
+    """
+    columns = cases.load_columns(filename)
+    expected = columns['expected']
+    if expected is None:
+        expected = compute_expected(cases.as_inputs(columns))
+    expected = np.array(expected, dtype=np.float64)
+
+    days = columns['days'].astype(np.int64)
+    return days, cases.miles(columns), cases.receipts(columns), expected
+
+def format_number(value):
+    """Format an input value the way jq prints it in eval.sh (integral values without a fraction)"""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def predict_all(predictor, days, miles, receipts):
+    """Run the predictor on every case, returning outputs (NaN on failure) and error messages"""
+    actual = np.full(len(days), np.nan)
+    errors = []
+
+    for i, (d, m, r) in enumerate(zip(days.tolist(), miles.tolist(), receipts.tolist())):
+        m = int(m) if m.is_integer() else m
+        try:
+            output = predictor(d, m, r)
+        except Exception as e:
+            errors.append(f"Case {i+1}: Script failed with error: {e}")
+            continue
+
+        try:
+            actual[i] = float(output)
+        except (TypeError, ValueError):
+            errors.append(f"Case {i+1}: Invalid output format: {output}")
+            continue
+
+        if not np.isfinite(actual[i]):
+            errors.append(f"Case {i+1}: Invalid output format: {output}")
+            actual[i] = np.nan
+
+    return actual, errors
+
+def predict_batch(predictor, days, miles, receipts):
+    """Run a vectorized predictor (e.g. reimbursement:calculate_reimbursement_batch) on all cases at once.
+
+    Raises ValueError if the predictor does not take arrays or does not return one output per case.
+    """
+    try:
+        actual = np.asarray(predictor(days, miles, receipts), dtype=np.float64)
+    except Exception as e:
+        raise ValueError(f"predictor failed on NumPy arrays ({e}); is it a batch predictor?") from e
+    if actual.shape != days.shape:
+        raise ValueError(f"predictor returned shape {actual.shape} for {len(days)} cases; is it a batch predictor?")
+    errors = [f"Case {i+1}: Invalid output format: {actual[i]}" for i in np.flatnonzero(~np.isfinite(actual))]
+    actual = np.where(np.isfinite(actual), actual, np.nan)
+    return actual, errors
+
+def summarize(days, miles, receipts, expected, actual):
+    """Compute the eval.sh summary statistics for the successful cases"""
+    ok = ~np.isnan(actual)
+    indices = np.flatnonzero(ok)
+
+    expected_units = np.round(expected[ok] * UNITS_PER_DOLLAR).astype(np.int64)
+    actual_units = np.round(actual[ok] * UNITS_PER_DOLLAR).astype(np.int64)
+    error_units = np.abs(actual_units - expected_units)
+
+    summary = {
+        'num_cases': len(expected),
+        'successful_runs': len(indices),
+        'exact_matches': int(np.count_nonzero(error_units < EXACT_UNITS)),
+        'close_matches': int(np.count_nonzero(error_units < CLOSE_UNITS)),
+        'total_error_units': int(error_units.sum()),
+        'worst_cases': [],
+    }
+
+    if len(indices) == 0:
+        return summary
+
+    # np.argmax returns the first maximum, like eval.sh's strict '>' update
+    worst = int(np.argmax(error_units))
+    summary['max_error'] = abs(Decimal(repr(float(actual[ok][worst]))) - Decimal(repr(float(expected[ok][worst]))))
+
+    # Stable descending sort by error
+    order = np.argsort(-error_units, kind='stable')[:5]
+    for j in order:
+        i = indices[j]
+        summary['worst_cases'].append((i + 1, int(days[i]), format_number(miles[i]), format_number(receipts[i]),
+                                       float(expected[i]), float(actual[i]), error_units[j] / UNITS_PER_DOLLAR))
+    return summary
+
+def format_bc(value):
+    """Format a Decimal the way bc prints it (no leading zero, bare 0 for zero)"""
+    if value == 0:
+        return '0'
+    text = f"{value:f}"
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+def truncate(value, scale):
+    """Truncate a Decimal to the given scale, like bc's scale=N division"""
+    return value.quantize(Decimal(1).scaleb(-scale), rounding=ROUND_DOWN)
+
+def print_report(dataset_file, summary, errors):
+    """Print the same report eval.sh prints"""
+    num_cases = summary['num_cases']
+    successful_runs = summary['successful_runs']
+    exact_matches = summary['exact_matches']
+    close_matches = summary['close_matches']
+
+    if successful_runs == 0:
+        print("❌ No successful test cases!")
+        print("")
+        print("Your script either:")
+        print("  - Failed to run properly")
+        print("  - Produced invalid output format")
+        print("  - Timed out on all cases")
+        print("")
+        print("Check the errors below for details.")
+    else:
+        total_error = Decimal(summary['total_error_units']) / UNITS_PER_DOLLAR
+        avg_error = truncate(total_error / successful_runs, 2)
+        exact_pct = truncate(Decimal(exact_matches * 100) / successful_runs, 1)
+        close_pct = truncate(Decimal(close_matches * 100) / successful_runs, 1)
+
+        print("✅ Evaluation Complete!")
+        print("")
+        print("📈 Results Summary:")
+        print(f"  Dataset: {dataset_file}")
+        print(f"  Total test cases: {num_cases}")
+        print(f"  Successful runs: {successful_runs}")
+        print(f"  Exact matches (±$0.01): {exact_matches} ({format_bc(exact_pct)}%)")
+        print(f"  Close matches (±$1.00): {close_matches} ({format_bc(close_pct)}%)")
+        print(f"  Average error: ${format_bc(avg_error)}")
+        print(f"  Maximum error: ${format_bc(summary['max_error'])}")
+        print("")
+
+        score = avg_error * 100 + (num_cases - exact_matches) * Decimal('0.1')
+        print(f"🎯 Your Score: {format_bc(truncate(score, 2))} (lower is better)")
+        print("")
+
+        if exact_matches == num_cases:
+            print("🏆 PERFECT SCORE! You have reverse-engineered the system completely!")
+        elif exact_matches > num_cases * 95 // 100:
+            print("🥇 Excellent! You are very close to the perfect solution.")
+        elif exact_matches > num_cases * 80 // 100:
+            print("🥈 Great work! You have captured most of the system behavior.")
+        elif exact_matches > num_cases * 50 // 100:
+            print("🥉 Good progress! You understand some key patterns.")
+        else:
+            print("📚 Keep analyzing the patterns in the interviews and test cases.")
+
+        print("")
+        print("💡 Tips for improvement:")
+        if exact_matches < num_cases:
+            print("  Check these high-error cases:")
+            for case_num, days, miles, receipts, expected, actual, error in summary['worst_cases']:
+                print(f"    Case {case_num}: {days} days, {miles} miles, ${receipts} receipts")
+                print(f"      Expected: ${expected:.2f}, Got: ${actual:.2f}, Error: ${error:.2f}")
+
+    if errors:
+        print()
+        print("⚠️  Errors encountered:")
+        for message in errors[:10]:
+            print(f"  {message}")
+        if len(errors) > 10:
+            print(f"  ... and {len(errors) - 10} more errors")
+
+    print()
+    print("📝 Next steps:")
+    print("  1. Fix any script errors shown above")
+    print("  2. Ensure your run.sh outputs only a number")
+    print("  3. Analyze the patterns in the interviews and public cases")
+    print("  4. Test edge cases around trip length and receipt amounts")
+    print("  5. Submit your solution via the Google Form when ready!")
+
+def evaluate(dataset_file='public_cases.json', predictor_spec=None, batch=False):
+    """Evaluate an importable predictor in-process and return the summary and error messages"""
+    predictor = load_predictor(predictor_spec or (DEFAULT_BATCH_PREDICTOR if batch else DEFAULT_PREDICTOR))
+    days, miles, receipts, expected = load_dataset(dataset_file)
+    if batch:
+        actual, errors = predict_batch(predictor, days, miles, receipts)
+    else:
+        actual, errors = predict_all(predictor, days, miles, receipts)
+    return summarize(days, miles, receipts, expected, actual), errors
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process replacement for eval.sh")
+    parser.add_argument('dataset_file', nargs='?', default='public_cases.json',
+                        help="JSON file with test cases (default: public_cases.json)")
+    parser.add_argument('--predictor',
+                        help=f"Predictor to evaluate as module:function (default: {DEFAULT_PREDICTOR}, "
+                             f"or {DEFAULT_BATCH_PREDICTOR} with --batch)")
+    parser.add_argument('--batch', action='store_true',
+                        help="The predictor takes NumPy arrays of days, miles and receipts and returns an array")
+    args = parser.parse_args()
+
+    print("🧾 Black Box Challenge - Reimbursement System Evaluation")
+    print("=======================================================")
+    print()
+
+    if not os.path.isfile(args.dataset_file):
+        print(f"❌ Error: Dataset file '{args.dataset_file}' not found!")
+        print(f"Usage: {sys.argv[0]} [dataset_file]")
+        print("  dataset_file: JSON file with test cases (default: public_cases.json)")
+        sys.exit(1)
+
+    print(f"📁 Using dataset: {args.dataset_file}")
+
+    try:
+        summary, errors = evaluate(args.dataset_file, args.predictor, args.batch)
+    except ValueError as e:
+        print(f"❌ Error: {args.predictor}: {e}" if args.predictor else f"❌ Error: {e}")
+        sys.exit(1)
+    print(f"📊 Running evaluation against {summary['num_cases']} test cases...")
+    print()
+    print_report(args.dataset_file, summary, errors)
+
+if __name__ == "__main__":
+    main()
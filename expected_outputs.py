@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import sys
+from cases import as_inputs, expected_outputs, load_columns
+from reimbursement import calculate_reimbursement
+
+def load_cases(filename):
+    """Load a dataset as (inputs, expected); expected is None for private format files"""
+    columns = load_columns(filename)
+    return as_inputs(columns), expected_outputs(columns)
+
+def compute_expected(inputs):
+    """Expected outputs for cases without them, using reimbursement.py as the oracle"""
+    return [
+        calculate_reimbursement(case['trip_duration_days'], case['miles_traveled'], case['total_receipts_amount'])
+        for case in inputs
+    ]
+
+def format_test_data(inputs, expected):
+    """Format cases as eval.sh's colon-separated days:miles:receipts:expected lines"""
+    return [
+        f"{case['trip_duration_days']}:{case['miles_traveled']}:{case['total_receipts_amount']}:{value}"
+        for case, value in zip(inputs, expected)
+    ]
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: expected_outputs.py <dataset_file>", file=sys.stderr)
+        sys.exit(1)
+
+    inputs, expected = load_cases(sys.argv[1])
+    if expected is None:
+        expected = compute_expected(inputs)
+
+    sys.stdout.write(''.join(line + '\n' for line in format_test_data(inputs, expected)))
+
+if __name__ == "__main__":
+    main()
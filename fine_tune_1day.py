@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 
-import json
+from cases import as_public_cases, load_columns
 
 def fine_tune_formula():
-    with open('trip_duration_datasets/trip_duration_1_days.json', 'r') as f:
-        data = json.load(f)
+    data = as_public_cases(load_columns('trip_duration_datasets/trip_duration_1_days.json'))
     
     print("Fine-tuning 1-Day Formula:")
     print("=" * 60)
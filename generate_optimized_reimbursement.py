@@ -69,7 +69,42 @@ def generate_optimized_reimbursement():
     """Generate the optimized reimbursement.py file"""
     params = get_optimized_parameters()
     
-    code = '''def calculate_reimbursement(trip_duration_days: int, miles_traveled: int, total_receipts_amount: float) -> float:
+    param_values = [
+        # 1-day parameters
+        params['day1_mile_rate'], params['day1_receipt_rate'], 
+        params['day1_high_miles_threshold'], params['day1_high_miles_penalty'],
+        params['day1_high_receipts_threshold'], params['day1_high_receipts_penalty'],
+        params['day1_ratio_threshold'], params['day1_ratio_penalty'],
+        
+        # 2-day parameters
+        params['day2_base'], params['day2_mile_rate'], params['day2_receipt_rate'],
+        params['day2_low_miles_threshold'], params['day2_low_miles_bonus'],
+        params['day2_high_miles_threshold'], params['day2_high_miles_penalty'],
+        
+        # 3-day parameters
+        params['day3_base'], params['day3_mile_rate'], params['day3_receipt_rate'],
+        params['day3_low_receipts_threshold'], params['day3_low_receipts_bonus'],
+        params['day3_high_miles_threshold'], params['day3_high_miles_penalty'],
+        params['day3_high_receipts_threshold'], params['day3_high_receipts_penalty'],
+        
+        # 4-6 day parameters
+        params['day46_daily_rate'], params['day46_mile_rate'], params['day46_receipt_rate'],
+        params['day46_low_miles_threshold'], params['day46_low_miles_bonus'],
+        params['day46_high_miles_threshold'], params['day46_high_miles_penalty'],
+        params['day46_high_receipts_threshold'], params['day46_high_receipts_penalty'],
+        
+        # 7+ day parameters
+        params['day7_daily_rate'], params['day7_mile_rate'], params['day7_receipt_rate'], params['day7_bonus'],
+        params['day7_hustle_ratio_threshold'], params['day7_hustle_mile_bonus'], params['day7_hustle_bonus_amount'],
+        params['day7_high_daily_spending_threshold'], params['day7_high_daily_spending_penalty'],
+        params['day7_vacation_penalty'], params['day7_high_miles_threshold'], params['day7_high_miles_penalty'],
+        params['day7_high_receipts_threshold'], params['day7_high_receipts_penalty'],
+        params['day7_cap_10plus'], params['day7_cap_7to9'], params['day7_cap_per_day'], params['day7_cap_default']
+    ]
+    
+    code = '''import numpy as np
+
+def calculate_reimbursement(trip_duration_days: int, miles_traveled: int, total_receipts_amount: float) -> float:
     """
     Scientifically optimized reimbursement calculation using differential evolution.
     Parameters optimized for minimum average error on public dataset.
@@ -239,38 +274,126 @@ def calculate_7_plus_day_trip(trip_duration_days: int, miles_traveled: int, tota
         reimbursement = cap
 
     return max(0, round(reimbursement, 2))
-'''.format(
-        # 1-day parameters
-        params['day1_mile_rate'], params['day1_receipt_rate'], 
-        params['day1_high_miles_threshold'], params['day1_high_miles_penalty'],
-        params['day1_high_receipts_threshold'], params['day1_high_receipts_penalty'],
-        params['day1_ratio_threshold'], params['day1_ratio_penalty'],
-        
-        # 2-day parameters
-        params['day2_base'], params['day2_mile_rate'], params['day2_receipt_rate'],
-        params['day2_low_miles_threshold'], params['day2_low_miles_bonus'],
-        params['day2_high_miles_threshold'], params['day2_high_miles_penalty'],
-        
-        # 3-day parameters
-        params['day3_base'], params['day3_mile_rate'], params['day3_receipt_rate'],
-        params['day3_low_receipts_threshold'], params['day3_low_receipts_bonus'],
-        params['day3_high_miles_threshold'], params['day3_high_miles_penalty'],
-        params['day3_high_receipts_threshold'], params['day3_high_receipts_penalty'],
-        
-        # 4-6 day parameters
-        params['day46_daily_rate'], params['day46_mile_rate'], params['day46_receipt_rate'],
-        params['day46_low_miles_threshold'], params['day46_low_miles_bonus'],
-        params['day46_high_miles_threshold'], params['day46_high_miles_penalty'],
-        params['day46_high_receipts_threshold'], params['day46_high_receipts_penalty'],
-        
-        # 7+ day parameters
-        params['day7_daily_rate'], params['day7_mile_rate'], params['day7_receipt_rate'], params['day7_bonus'],
-        params['day7_hustle_ratio_threshold'], params['day7_hustle_mile_bonus'], params['day7_hustle_bonus_amount'],
-        params['day7_high_daily_spending_threshold'], params['day7_high_daily_spending_penalty'],
-        params['day7_vacation_penalty'], params['day7_high_miles_threshold'], params['day7_high_miles_penalty'],
-        params['day7_high_receipts_threshold'], params['day7_high_receipts_penalty'],
-        params['day7_cap_10plus'], params['day7_cap_7to9'], params['day7_cap_per_day'], params['day7_cap_default']
-    )
+
+def round_like_python(values):
+    """
+    Vectorized round(x, 2) with Python's exact semantics.
+    np.round scales by 100 in binary floating point, which can land on the other side
+    of a .5 boundary; those few near-tie values are rounded with the builtin instead.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, 2) for value in values[near_tie].tolist()]
+    return rounded
+
+def calculate_reimbursement_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """
+    Vectorized calculate_reimbursement over NumPy arrays.
+    Cases are dispatched to each duration segment with masks, and every threshold
+    becomes an np.where multiplier applied in the same order as the scalar code,
+    so results are bit-identical to calling calculate_reimbursement per case.
+    """
+    days = np.asarray(trip_duration_days)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+    
+    reimbursement = np.zeros(days.shape, dtype=np.float64)
+    valid = days >= 1
+    
+    mask = days == 1
+    reimbursement[mask] = calculate_1_day_trip_batch(miles[mask], receipts[mask])
+    mask = days == 2
+    reimbursement[mask] = calculate_2_day_trip_batch(miles[mask], receipts[mask])
+    mask = days == 3
+    reimbursement[mask] = calculate_3_day_trip_batch(miles[mask], receipts[mask])
+    mask = (days >= 4) & (days <= 6)
+    reimbursement[mask] = calculate_4_6_day_trip_batch(days[mask], miles[mask], receipts[mask])
+    mask = days >= 7
+    reimbursement[mask] = calculate_7_plus_day_trip_batch(days[mask], miles[mask], receipts[mask])
+    
+    # Every segment ends with max(0, round(reimbursement, 2)); other durations return 0.0
+    rounded = round_like_python(reimbursement)
+    return np.where(valid & (rounded > 0), rounded, 0.0)
+
+def calculate_1_day_trip_batch(miles_traveled, total_receipts_amount):
+    """Vectorized calculate_1_day_trip before rounding"""
+    reimbursement = (miles_traveled * {:.4f}) + (total_receipts_amount * {:.4f})
+    reimbursement = np.where(miles_traveled > {:.1f}, reimbursement * {:.4f}, reimbursement)
+    reimbursement = np.where(total_receipts_amount > {:.1f}, reimbursement * {:.4f}, reimbursement)
+    
+    positive = total_receipts_amount > 0
+    miles_receipts_ratio = np.divide(miles_traveled, total_receipts_amount,
+                                     out=np.zeros_like(reimbursement), where=positive)
+    reimbursement = np.where(miles_receipts_ratio > {:.4f}, reimbursement * {:.4f}, reimbursement)
+    return reimbursement
+
+def calculate_2_day_trip_batch(miles_traveled, total_receipts_amount):
+    """Vectorized calculate_2_day_trip before rounding"""
+    reimbursement = {:.2f} + (miles_traveled * {:.4f}) + (total_receipts_amount * {:.4f})
+    reimbursement = np.where(miles_traveled < {:.1f}, reimbursement * {:.4f}, reimbursement)
+    reimbursement = np.where(miles_traveled > {:.1f}, reimbursement * {:.4f}, reimbursement)
+    return reimbursement
+
+def calculate_3_day_trip_batch(miles_traveled, total_receipts_amount):
+    """Vectorized calculate_3_day_trip before rounding"""
+    reimbursement = {:.2f} + (miles_traveled * {:.4f}) + (total_receipts_amount * {:.4f})
+    reimbursement = np.where(total_receipts_amount < {:.1f}, reimbursement * {:.4f}, reimbursement)
+    reimbursement = np.where(miles_traveled > {:.1f}, reimbursement * {:.4f}, reimbursement)
+    reimbursement = np.where(total_receipts_amount > {:.1f}, reimbursement * {:.4f}, reimbursement)
+    return reimbursement
+
+def calculate_4_6_day_trip_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """Vectorized calculate_4_6_day_trip before rounding"""
+    reimbursement = (trip_duration_days * {:.3f}) + (miles_traveled * {:.4f}) + (total_receipts_amount * {:.4f})
+    reimbursement = np.where(miles_traveled < {:.1f}, reimbursement * {:.4f}, reimbursement)
+    reimbursement = np.where(miles_traveled > {:.1f}, reimbursement * {:.4f}, reimbursement)
+    reimbursement = np.where(total_receipts_amount > {:.1f}, reimbursement * {:.4f}, reimbursement)
+    return reimbursement
+
+def calculate_7_plus_day_trip_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """Vectorized calculate_7_plus_day_trip before rounding"""
+    daily_rate = {:.3f}
+    mile_rate = np.full(miles_traveled.shape, {:.4f})
+    receipt_rate = np.full(miles_traveled.shape, {:.4f})
+    bonus = np.full(miles_traveled.shape, {:.3f})
+    
+    positive = total_receipts_amount > 0
+    miles_receipts_ratio = np.divide(miles_traveled, total_receipts_amount,
+                                     out=np.zeros_like(mile_rate), where=positive)
+    hustle = miles_receipts_ratio > {:.4f}
+    mile_rate = np.where(hustle, mile_rate * {:.4f}, mile_rate)
+    bonus = np.where(hustle, bonus + {:.3f}, bonus)
+    
+    high_spending = (total_receipts_amount / trip_duration_days) > {:.1f}
+    receipt_rate = np.where(high_spending, receipt_rate * {:.4f}, receipt_rate)
+    receipt_rate = np.where(high_spending & (trip_duration_days >= 8), receipt_rate * {:.4f}, receipt_rate)
+    
+    mile_rate = np.where(miles_traveled > {:.1f}, mile_rate * {:.4f}, mile_rate)
+    receipt_rate = np.where(total_receipts_amount > {:.1f}, receipt_rate * {:.4f}, receipt_rate)
+    
+    reimbursement = (trip_duration_days * daily_rate) + (miles_traveled * mile_rate) + (total_receipts_amount * receipt_rate) + bonus
+    
+    cap = np.where(trip_duration_days >= 10, {:.1f},
+                   np.where(trip_duration_days >= 7, {:.3f} + (trip_duration_days * {:.3f}), {:.3f}))
+    return np.where(reimbursement > cap, cap, reimbursement)
+
+if __name__ == "__main__":
+    import sys
+    from stream_io import parse_case, run_stream
+
+    if len(sys.argv) == 4:
+        print(calculate_reimbursement(*parse_case(*sys.argv[1:])))
+    elif sys.argv[1:] == ['--stream']:
+        # Batch mode: 'days miles receipts' (or JSON) lines on stdin, one result per line on stdout
+        run_stream(lambda cases: [str(calculate_reimbursement(*case)) for case in cases])
+    else:
+        print("Usage: reimbursement.py <trip_duration_days> <miles_traveled> <total_receipts_amount>")
+        print("       reimbursement.py --stream < cases.txt")
+        sys.exit(1)
+'''.format(*param_values, *param_values)  # the scalar and batch functions take the same parameters
     
     return code
 
@@ -1,23 +1,18 @@
 #!/usr/bin/env python3
 
-import json
+import numpy as np
 import pandas as pd
-import pickle
-from xgboost_solution import create_features
+from cases import as_inputs, load_columns
+from xgboost_solution import load_model_data, model_features, predict_features
 
 def generate_private_predictions():
     """Generate predictions for all private cases and save to private_results.txt"""
     
     print("Loading XGBoost model...")
-    with open('xgboost_model.pkl', 'rb') as f:
-        model_data = pickle.load(f)
-    
-    model = model_data['model']
-    feature_names = model_data['feature_names']
+    model_data = load_model_data()
     
     print("Loading private cases...")
-    with open('private_cases.json', 'r') as f:
-        data = json.load(f)
+    data = as_inputs(load_columns('private_cases.json'))
     
     print(f"Processing {len(data)} private cases...")
     
@@ -39,13 +34,10 @@ def generate_private_predictions():
     input_df = pd.DataFrame(input_rows)
     
     print(f"Creating features for {len(input_df)} cases...")
-    features = create_features(input_df)
-    
-    # Ensure feature order matches training
-    features = features.reindex(columns=feature_names, fill_value=0)
+    features = model_features(model_data, input_df)
     
     print("Generating batch predictions...")
-    predictions = model.predict(features)
+    predictions = predict_features(model_data, np.asarray(features, dtype=np.float32))
     
     # Save results to private_results.txt (one per line)
     print("Saving results to private_results.txt...")
@@ -19,6 +19,13 @@ if ! command -v jq &> /dev/null; then
     exit 1
 fi
 
+# Check if python3 is available for the parallel runner
+if ! command -v python3 &> /dev/null; then
+    echo "❌ Error: python3 is required but not installed!"
+    echo "It is used to run test cases in parallel (parallel_runner.py)."
+    exit 1
+fi
+
 # Check if run.sh exists
 if [ ! -f "run.sh" ]; then
     echo "❌ Error: run.sh not found!"
@@ -58,6 +65,13 @@ rm -f private_results.txt
 
 echo "Processing $total_cases test cases..." >&2
 
+# Run all cases through run.sh concurrently (RUN_JOBS slots, default: core count).
+# Each result line holds status, stdout and stderr of a single execution, in input order.
+run_results=()
+while IFS= read -r line; do
+    run_results+=("$line")
+done < <(printf '%s\n' "${test_cases[@]}" | python3 parallel_runner.py --script ./run.sh ${RUN_JOBS:+--jobs "$RUN_JOBS"})
+
 # Process each test case
 for ((i=0; i<total_cases; i++)); do
     if [ $((i % 100)) -eq 0 ] && [ $i -gt 0 ]; then
@@ -67,10 +81,10 @@ for ((i=0; i<total_cases; i++)); do
     # Extract test case data from pre-loaded array
     IFS=':' read -r trip_duration miles_traveled receipts_amount <<< "${test_cases[i]}"
     
-    # Run the user's implementation
-    if script_output=$(./run.sh "$trip_duration" "$miles_traveled" "$receipts_amount" 2>/dev/null); then
+    # Look up the result of the user's implementation
+    IFS=$'\x1f' read -r run_status output error_msg <<< "${run_results[i]}"
+    if [ "$run_status" = "ok" ]; then
         # Check if output is a valid number
-        output=$(echo "$script_output" | tr -d '[:space:]')
         if [[ $output =~ ^-?[0-9]+\.?[0-9]*$ ]]; then
             echo "$output" >> private_results.txt
         else
@@ -78,8 +92,6 @@ for ((i=0; i<total_cases; i++)); do
             echo "ERROR" >> private_results.txt
         fi
     else
-        # Capture stderr for error reporting
-        error_msg=$(./run.sh "$trip_duration" "$miles_traveled" "$receipts_amount" 2>&1 >/dev/null | tr -d '\n')
         echo "Error on case $((i+1)): Script failed: $error_msg" >&2
         echo "ERROR" >> private_results.txt
     fi
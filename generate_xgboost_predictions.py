@@ -1,23 +1,20 @@
 #!/usr/bin/env python3
 
 import json
+import numpy as np
 import pandas as pd
-import pickle
-from xgboost_solution import create_features
+from cases import as_public_cases, load_columns
+from prediction_index import PREDICTIONS_METADATA_FILE
+from xgboost_solution import load_model_data, model_features, predict_features
 
 def generate_all_predictions():
     """Generate predictions for all public cases and save to file"""
     
     print("Loading XGBoost model...")
-    with open('xgboost_model.pkl', 'rb') as f:
-        model_data = pickle.load(f)
-    
-    model = model_data['model']
-    feature_names = model_data['feature_names']
+    model_data = load_model_data()
     
     print("Loading public cases...")
-    with open('public_cases.json', 'r') as f:
-        data = json.load(f)
+    data = as_public_cases(load_columns('public_cases.json'))
     
     # Create lookup dictionary: (days, miles, receipts) -> prediction
     predictions_lookup = {}
@@ -45,13 +42,10 @@ def generate_all_predictions():
     input_df = pd.DataFrame(input_rows)
     
     print(f"Creating features for {len(input_df)} cases...")
-    features = create_features(input_df)
-    
-    # Ensure feature order matches training
-    features = features.reindex(columns=feature_names, fill_value=0)
+    features = model_features(model_data, input_df)
     
     print("Generating batch predictions...")
-    predictions = model.predict(features)
+    predictions = predict_features(model_data, np.asarray(features, dtype=np.float32))
     
     # Create lookup dictionary
     for i, (case_key, prediction) in enumerate(zip(case_keys, predictions)):
@@ -61,9 +55,13 @@ def generate_all_predictions():
     print("Saving predictions lookup...")
     with open('xgboost_predictions.json', 'w') as f:
         json.dump(predictions_lookup, f, indent=2)
+
+    # Record which model made them, so run.sh can ignore them once the model changes
+    with open(PREDICTIONS_METADATA_FILE, 'w') as f:
+        json.dump({'model_sha256': model_data['sha256']}, f, indent=2)
     
     print(f"✅ Generated {len(predictions_lookup)} predictions")
-    print("Saved to 'xgboost_predictions.json'")
+    print(f"Saved to 'xgboost_predictions.json' (model hash in '{PREDICTIONS_METADATA_FILE}')")
     
     # Test a few predictions
     print("\nSample predictions:")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# Nearest known cases: a KD-tree over the public cases in normalized (days, miles, receipts)
+# space, persisted to disk, for exact-match and k-nearest-neighbour interpolated predictions.
+
+import argparse
+import os
+import pickle
+import sys
+import numpy as np
+from scipy.spatial import cKDTree
+from cases import load_columns, miles, receipts, source_sha256
+
+CASES_FILE = 'public_cases.json'
+INDEX_FILE = 'public_cases.kdtree.pkl'
+
+# Neighbours averaged by interpolate, and how far (in normalized units, i.e. standard
+# deviations of each input) a neighbour may be before it is not trusted
+DEFAULT_K = 5
+DEFAULT_RADIUS = 0.01
+EXACT_RADIUS = 1e-9
+
+def case_columns(cases):
+    """(n, 3) float64 array of days, miles, receipts from case dicts or (days, miles, receipts) tuples"""
+    if len(cases) and isinstance(cases[0], dict):
+        cases = [(case['trip_duration_days'], case['miles_traveled'], case['total_receipts_amount']) for case in cases]
+    return np.asarray(cases, dtype=np.float64).reshape(-1, 3)
+
+def build_neighbor_index(cases_file=CASES_FILE, index_file=INDEX_FILE):
+    """Build the KD-tree over a public-format case file and save it next to it"""
+    columns = load_columns(cases_file)
+    points = np.column_stack([columns['days'].astype(np.float64), miles(columns), receipts(columns)])
+
+    # Each input is scaled to unit standard deviation so no single input dominates distances
+    offset = points.mean(axis=0)
+    scale = points.std(axis=0)
+    scale[scale == 0] = 1.0
+    index = {
+        'tree': cKDTree((points - offset) / scale),
+        'offset': offset,
+        'scale': scale,
+        'outputs': np.array(columns['expected'], dtype=np.float64),
+        'source_sha256': source_sha256(cases_file)
+    }
+
+    with open(index_file, 'wb') as f:
+        pickle.dump(index, f)
+    return index
+
+# Loaded indexes keyed by file, so repeated queries in one process only load once
+_index_cache = {}
+
+def load_neighbor_index(cases_file=CASES_FILE, index_file=INDEX_FILE):
+    """Load the saved KD-tree, rebuilding it if it is missing or the case file has changed"""
+    mtimes = tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in (cases_file, index_file))
+    cached = _index_cache.get((cases_file, index_file))
+    if cached is not None and cached[0] == mtimes:
+        return cached[1]
+
+    index = None
+    if os.path.exists(index_file):
+        with open(index_file, 'rb') as f:
+            index = pickle.load(f)
+        if source_sha256(cases_file) != index['source_sha256']:
+            index = None
+    if index is None:
+        index = build_neighbor_index(cases_file, index_file)
+        mtimes = (mtimes[0], os.path.getmtime(index_file))
+
+    _index_cache[(cases_file, index_file)] = (mtimes, index)
+    return index
+
+def query(index, cases, k=DEFAULT_K, radius=DEFAULT_RADIUS):
+    """Distances and row numbers of the k nearest known cases within radius.
+
+    Missing neighbours have distance inf and row number len(outputs), as in cKDTree.query.
+    """
+    points = (case_columns(cases) - index['offset']) / index['scale']
+    distances, rows = index['tree'].query(points, k=k, distance_upper_bound=radius)
+    return distances.reshape(len(points), k), rows.reshape(len(points), k)
+
+def exact_matches(index, cases):
+    """Known output for each case that is in the index, NaN for the rest"""
+    # cKDTree only returns neighbours strictly closer than the bound, so it cannot be 0
+    distances, rows = query(index, cases, k=1, radius=EXACT_RADIUS)
+    outputs = np.append(index['outputs'], np.nan)
+    return np.where(distances[:, 0] == 0, outputs[rows[:, 0]], np.nan)
+
+def interpolate(index, cases, k=DEFAULT_K, radius=DEFAULT_RADIUS):
+    """Inverse-distance weighted average of the known neighbours within radius.
+
+    A case that matches a known case exactly gets its output; a case with no
+    neighbour within radius gets NaN, meaning the neighbours should not be trusted.
+    """
+    distances, rows = query(index, cases, k, radius)
+    found = np.isfinite(distances)
+    outputs = np.append(index['outputs'], np.nan)[rows]
+
+    with np.errstate(divide='ignore'):
+        weights = np.where(found, 1.0 / distances, 0.0)
+    exact = distances[:, 0] == 0
+    weights[exact] = np.where(distances[exact] == 0, 1.0, 0.0)
+
+    total = weights.sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        predictions = (weights * np.where(found, outputs, 0.0)).sum(axis=1) / total
+    predictions[~found[:, 0]] = np.nan
+    return predictions
+
+def predict_neighbors(days, miles, receipts, k=DEFAULT_K, radius=DEFAULT_RADIUS):
+    """Interpolated prediction for one case rounded like predict_single, or None if no neighbour is close enough"""
+    prediction = interpolate(load_neighbor_index(), [(days, miles, receipts)], k, radius)[0]
+    return None if np.isnan(prediction) else round(float(prediction), 2)
+
+def leave_one_out(index, k=DEFAULT_K, radius=DEFAULT_RADIUS):
+    """(coverage, mean absolute error) of interpolating each known case from the others"""
+    points = index['tree'].data
+    distances, rows = index['tree'].query(points, k=k + 1, distance_upper_bound=radius)
+    # Drop each case itself (always the first result, at distance 0) from its neighbours
+    distances, rows = distances[:, 1:], rows[:, 1:]
+    found = np.isfinite(distances)
+    outputs = np.append(index['outputs'], np.nan)[rows]
+
+    with np.errstate(divide='ignore'):
+        weights = np.where(found, 1.0 / np.maximum(distances, 1e-12), 0.0)
+    covered = found[:, 0]
+    outputs = np.where(found, outputs, 0.0)
+    predictions = (weights[covered] * outputs[covered]).sum(axis=1) / weights[covered].sum(axis=1)
+    errors = np.abs(predictions - index['outputs'][covered])
+    return covered.mean(), errors.mean() if len(errors) else float('nan')
+
+def main():
+    parser = argparse.ArgumentParser(description="Nearest-neighbour predictions from the public cases")
+    parser.add_argument('case', nargs='*', help="trip_duration_days miles_traveled total_receipts_amount")
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help=f"Neighbours to interpolate (default: {DEFAULT_K})")
+    parser.add_argument('--radius', type=float, default=DEFAULT_RADIUS,
+                        help=f"Largest trusted normalized distance (default: {DEFAULT_RADIUS})")
+    parser.add_argument('--build', action='store_true', help=f"Rebuild {INDEX_FILE} from {CASES_FILE}")
+    parser.add_argument('--evaluate', action='store_true', help="Leave-one-out accuracy for a range of radii")
+    args = parser.parse_args()
+
+    if args.build:
+        index = build_neighbor_index()
+        print(f"✅ Indexed {len(index['outputs'])} cases from {CASES_FILE} into {INDEX_FILE}")
+    elif args.evaluate:
+        index = load_neighbor_index()
+        print(f"📊 Leave-one-out interpolation with k={args.k}:")
+        for radius in (0.01, 0.02, 0.05, 0.1, 0.2, 0.5):
+            coverage, mae = leave_one_out(index, args.k, radius)
+            print(f"  radius {radius:<5} coverage {coverage * 100:5.1f}%  MAE ${mae:.2f}")
+    elif len(args.case) == 3:
+        prediction = predict_neighbors(*map(float, args.case), k=args.k, radius=args.radius)
+        if prediction is None:
+            print("No known case within the radius", file=sys.stderr)
+            sys.exit(1)
+        print(prediction)
+    else:
+        parser.print_usage()
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,21 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
+import os
+import pickle
 import numpy as np
+from cases import load_columns, miles, receipts
+from segments import build_segment_index, stratified_sample
 from scipy.optimize import minimize
 from scipy.optimize import differential_evolution
 import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
 def load_data():
-    """Load the public cases data"""
-    with open('public_cases.json', 'r') as f:
-        data = json.load(f)
-    
-    cases = []
-    for case in data:
-        cases.append({
-            'days': case['input']['trip_duration_days'],
-            'miles': case['input']['miles_traveled'],
-            'receipts': case['input']['total_receipts_amount'],
-            'expected': case['expected_output']
-        })
-    return cases
+    """Load the public cases data as typed columns (see cases.py)"""
+    return load_columns('public_cases.json')
 
 def parameterized_reimbursement(days, miles, receipts, params):
     """
@@ -346,11 +342,597 @@ def objective_function(param_values, cases, param_names):
     avg_error = total_error / len(cases)
     return avg_error
 
-def optimize_parameters():
+# Duration segments of the parameterized model; each one only uses its own parameter group
+SEGMENTS = ['day1', 'day2', 'day3', 'day46', 'day7']
+
+def load_arrays(columns):
+    """Split cases.py columns into per-segment float64 arrays for the vectorized objective"""
+    days = columns['days'].astype(np.float64)
+    miles_traveled = miles(columns)
+    receipts_amount = receipts(columns)
+    expected = np.asarray(columns['expected'], dtype=np.float64)
+    
+    masks = {
+        'day1': days == 1,
+        'day2': days == 2,
+        'day3': days == 3,
+        'day46': (days >= 4) & (days <= 6),
+        'day7': days >= 7,
+    }
+    
+    data = {'count': len(days)}
+    for segment, mask in masks.items():
+        segment_receipts = receipts_amount[mask]
+        data[segment] = {
+            'days': days[mask],
+            'miles': miles_traveled[mask],
+            'receipts': segment_receipts,
+            'expected': expected[mask],
+            # Input-only quantities that never change during optimization
+            'ratio': np.divide(miles_traveled[mask], segment_receipts,
+                               out=np.zeros_like(segment_receipts), where=segment_receipts > 0),
+            'daily_spending': segment_receipts / days[mask],
+        }
+    
+    # Any other durations are predicted as 0, so their error is constant
+    other = ~np.any(list(masks.values()), axis=0)
+    data['other_error'] = np.abs(expected[other]).sum()
+    return data
+
+def calculate_1_day_vectorized(params, c):
+    """Vectorized calculate_1_day_parameterized; params may hold scalars or (n, 1) columns"""
+    reimbursement = (c['miles'] * params['day1_mile_rate']) + (c['receipts'] * params['day1_receipt_rate'])
+    reimbursement = np.where(c['miles'] > params['day1_high_miles_threshold'],
+                             reimbursement * params['day1_high_miles_penalty'], reimbursement)
+    reimbursement = np.where(c['receipts'] > params['day1_high_receipts_threshold'],
+                             reimbursement * params['day1_high_receipts_penalty'], reimbursement)
+    reimbursement = np.where(c['ratio'] > params['day1_ratio_threshold'],
+                             reimbursement * params['day1_ratio_penalty'], reimbursement)
+    return np.maximum(reimbursement, 0)
+
+def calculate_2_day_vectorized(params, c):
+    """Vectorized calculate_2_day_parameterized"""
+    reimbursement = params['day2_base'] + (c['miles'] * params['day2_mile_rate']) + (c['receipts'] * params['day2_receipt_rate'])
+    reimbursement = np.where(c['miles'] < params['day2_low_miles_threshold'],
+                             reimbursement * params['day2_low_miles_bonus'], reimbursement)
+    reimbursement = np.where(c['miles'] > params['day2_high_miles_threshold'],
+                             reimbursement * params['day2_high_miles_penalty'], reimbursement)
+    return np.maximum(reimbursement, 0)
+
+def calculate_3_day_vectorized(params, c):
+    """Vectorized calculate_3_day_parameterized"""
+    reimbursement = params['day3_base'] + (c['miles'] * params['day3_mile_rate']) + (c['receipts'] * params['day3_receipt_rate'])
+    reimbursement = np.where(c['receipts'] < params['day3_low_receipts_threshold'],
+                             reimbursement * params['day3_low_receipts_bonus'], reimbursement)
+    reimbursement = np.where(c['miles'] > params['day3_high_miles_threshold'],
+                             reimbursement * params['day3_high_miles_penalty'], reimbursement)
+    reimbursement = np.where(c['receipts'] > params['day3_high_receipts_threshold'],
+                             reimbursement * params['day3_high_receipts_penalty'], reimbursement)
+    return np.maximum(reimbursement, 0)
+
+def calculate_4_6_day_vectorized(params, c):
+    """Vectorized calculate_4_6_day_parameterized"""
+    reimbursement = ((c['days'] * params['day46_daily_rate']) + (c['miles'] * params['day46_mile_rate'])
+                     + (c['receipts'] * params['day46_receipt_rate']))
+    reimbursement = np.where(c['miles'] < params['day46_low_miles_threshold'],
+                             reimbursement * params['day46_low_miles_bonus'], reimbursement)
+    reimbursement = np.where(c['miles'] > params['day46_high_miles_threshold'],
+                             reimbursement * params['day46_high_miles_penalty'], reimbursement)
+    reimbursement = np.where(c['receipts'] > params['day46_high_receipts_threshold'],
+                             reimbursement * params['day46_high_receipts_penalty'], reimbursement)
+    return np.maximum(reimbursement, 0)
+
+def calculate_7_plus_day_vectorized(params, c):
+    """Vectorized calculate_7_plus_day_parameterized"""
+    # Hustle bonus
+    hustle = c['ratio'] > params['day7_hustle_ratio_threshold']
+    mile_rate = np.where(hustle, params['day7_mile_rate'] * params['day7_hustle_mile_bonus'], params['day7_mile_rate'])
+    bonus = np.where(hustle, params['day7_bonus'] + params['day7_hustle_bonus_amount'], params['day7_bonus'])
+    
+    # Daily spending and vacation penalties
+    high_spending = c['daily_spending'] > params['day7_high_daily_spending_threshold']
+    receipt_rate = np.where(high_spending, params['day7_receipt_rate'] * params['day7_high_daily_spending_penalty'],
+                            params['day7_receipt_rate'])
+    receipt_rate = np.where(high_spending & (c['days'] >= 8), receipt_rate * params['day7_vacation_penalty'], receipt_rate)
+    
+    # High values penalties
+    mile_rate = np.where(c['miles'] > params['day7_high_miles_threshold'],
+                         mile_rate * params['day7_high_miles_penalty'], mile_rate)
+    receipt_rate = np.where(c['receipts'] > params['day7_high_receipts_threshold'],
+                            receipt_rate * params['day7_high_receipts_penalty'], receipt_rate)
+    
+    reimbursement = (c['days'] * params['day7_daily_rate']) + (c['miles'] * mile_rate) + (c['receipts'] * receipt_rate) + bonus
+    
+    # Caps
+    cap = np.where(c['days'] >= 10, params['day7_cap_10plus'],
+                   np.where(c['days'] >= 7, params['day7_cap_7to9'] + (c['days'] * params['day7_cap_per_day']),
+                            params['day7_cap_default']))
+    reimbursement = np.minimum(reimbursement, cap)
+    
+    return np.maximum(reimbursement, 0)
+
+SEGMENT_FUNCTIONS = {
+    'day1': calculate_1_day_vectorized,
+    'day2': calculate_2_day_vectorized,
+    'day3': calculate_3_day_vectorized,
+    'day46': calculate_4_6_day_vectorized,
+    'day7': calculate_7_plus_day_vectorized,
+}
+
+def segment_total_error(segment, params, data):
+    """Total absolute error over one segment's cases (summed over the last axis)"""
+    c = data[segment]
+    predicted = SEGMENT_FUNCTIONS[segment](params, c)
+    return np.abs(predicted - c['expected']).sum(axis=-1)
+
+def vectorized_objective(param_values, data, param_names, segments=None):
+    """
+    Same average absolute error as objective_function, computed on pre-extracted NumPy columns.
+    With segments, only those segments' error contribution to the overall average is returned.
+    """
+    params = dict(zip(param_names, param_values))
+    
+    if segments is None:
+        segments = SEGMENTS
+        total_error = data['other_error']
+    else:
+        total_error = 0.0
+    for segment in segments:
+        total_error = total_error + segment_total_error(segment, params, data)
+    
+    return total_error / data['count']
+
+# Upper bound on the (candidates x cases) float64 temporaries built per chunk of candidates
+POPULATION_MEMORY_BUDGET = 64 * 1024**2
+
+# Roughly how many (candidates x cases) arrays a segment formula keeps alive at once
+TEMPORARIES_PER_CANDIDATE = 8
+
+def population_objective(param_matrix, data, param_names, segments=None, memory_budget=POPULATION_MEMORY_BUDGET):
+    """
+    Average absolute error for every column of param_matrix (n_params x candidates).
+    Candidates are broadcast against all cases as (candidates x cases) arrays, in chunks
+    small enough to stay within memory_budget bytes.
+    """
+    param_matrix = np.asarray(param_matrix, dtype=np.float64)
+    if param_matrix.ndim == 1:
+        param_matrix = param_matrix[:, None]
+    n_candidates = param_matrix.shape[1]
+    
+    bytes_per_candidate = data['count'] * 8 * TEMPORARIES_PER_CANDIDATE
+    chunk_size = max(1, memory_budget // bytes_per_candidate)
+    
+    errors = np.empty(n_candidates)
+    for start in range(0, n_candidates, chunk_size):
+        block = param_matrix[:, start:start + chunk_size]
+        errors[start:start + chunk_size] = vectorized_objective(block[:, :, None], data, param_names, segments)
+    return errors
+
+# Successive halving: nested stratified subsamples drawn with segments.stratified_sample (the same
+# per-duration scheme as create_subset.py), about 1/9 and 1/3 of the public cases, then every case
+HALVING_SAMPLES_PER_DURATION = (8, 24)
+HALVING_ETA = 3  # keep the best 1/eta of the candidates at each rung
+
+def make_halving_objective(rungs, param_names, eta=HALVING_ETA):
+    """
+    Population objective that screens candidates on increasingly large subsamples (rungs of
+    load_arrays data, the last covering every case). Only the best 1/eta of the candidates
+    move up a rung; the rest score inf, which DE treats as a rejected trial. Survivors get
+    their full-data error, so accepted trials are compared with their parents exactly.
+    The first call (the initial population) is always scored on the full data.
+    Returns (objective, stats), stats counting scored case evaluations.
+    """
+    stats = {'calls': 0, 'case_evaluations': 0, 'full_case_evaluations': 0}
+    full = rungs[-1]
+    
+    def objective(param_matrix):
+        param_matrix = np.asarray(param_matrix, dtype=np.float64)
+        if param_matrix.ndim == 1:
+            param_matrix = param_matrix[:, None]
+        n_candidates = param_matrix.shape[1]
+        stats['full_case_evaluations'] += n_candidates * full['count']
+        stats['calls'] += 1
+        
+        if stats['calls'] == 1 or n_candidates == 1:
+            stats['case_evaluations'] += n_candidates * full['count']
+            return population_objective(param_matrix, full, param_names)
+        
+        errors = np.full(n_candidates, np.inf)
+        survivors = np.arange(n_candidates)
+        for rung in rungs:
+            scores = population_objective(param_matrix[:, survivors], rung, param_names)
+            stats['case_evaluations'] += len(survivors) * rung['count']
+            if rung is full:
+                errors[survivors] = scores
+                break
+            keep = max(1, -(-len(survivors) // eta))
+            survivors = survivors[np.argsort(scores, kind='stable')[:keep]]
+        return errors
+    
+    return objective, stats
+
+def segment_parameters(segment, bounds, param_names):
+    """Bounds and names of the parameters a duration segment uses (they share its prefix)"""
+    selected = [(bound, name) for bound, name in zip(bounds, param_names) if name.startswith(segment + '_')]
+    return [bound for bound, _ in selected], [name for _, name in selected]
+
+def optimize_segment(segment, data, bounds, param_names, maxiter=300, popsize=15, seed=42, init='latinhypercube'):
+    """Run differential evolution on one duration segment's parameters and cases only"""
+    start_time = time.time()
+    result = differential_evolution(
+        population_objective,
+        bounds,
+        args=(data, param_names, [segment]),
+        maxiter=maxiter,
+        popsize=popsize,
+        seed=seed,
+        init=init,
+        updating='deferred',
+        vectorized=True
+    )
+    return segment, dict(zip(param_names, result.x)), result.fun, time.time() - start_time
+
+def optimize_segments(data, bounds, param_names, maxiter=300, popsize=15, seed=42, warm_params=None):
+    """
+    Optimize each duration segment as an independent, lower-dimensional problem in a process pool.
+    Every parameter belongs to exactly one segment and each segment only sees its own cases,
+    so the merged parameter set minimizes the total error.
+    With warm_params, each segment's population starts around that parameter set.
+    """
+    optimized_params = {}
+    optimized_error = data['other_error'] / data['count']
+    
+    with ProcessPoolExecutor(max_workers=min(len(SEGMENTS), os.cpu_count() or 1)) as executor:
+        futures = []
+        for segment in SEGMENTS:
+            segment_bounds, segment_names = segment_parameters(segment, bounds, param_names)
+            init = 'latinhypercube'
+            if warm_params is not None:
+                init = warm_start_population([warm_params[name] for name in segment_names], segment_bounds,
+                                             popsize, seed=seed)
+            futures.append(executor.submit(optimize_segment, segment, data, segment_bounds, segment_names,
+                                           maxiter, popsize, seed, init))
+        
+        print(f"\n{'Segment':<8} {'Params':<7} {'Cases':<6} {'Contribution':<13} {'Time':<6}")
+        print("-" * 45)
+        for future in futures:
+            segment, params, contribution, elapsed = future.result()
+            optimized_params.update(params)
+            optimized_error += contribution
+            print(f"{segment:<8} {len(params):<7} {len(data[segment]['expected']):<6} ${contribution:<12.2f} {elapsed:<.1f}s")
+    
+    return optimized_params, optimized_error
+
+# Island model: per-case columns shared with worker processes (segments stored contiguously)
+CASE_COLUMNS = ['days', 'miles', 'receipts', 'expected', 'ratio', 'daily_spending']
+ISLAND_EPOCH_GENERATIONS = 25  # generations between migrations
+ISLAND_MIGRANTS = 2  # best individuals sent to the next island in the ring
+
+def share_arrays(data):
+    """
+    Copy the per-segment case arrays into one shared memory block.
+    Returns (shared memory, spec); attach_arrays(spec) rebuilds the data dict as read-only views.
+    """
+    layout = {}
+    start = 0
+    for segment in SEGMENTS:
+        end = start + len(data[segment]['expected'])
+        layout[segment] = (start, end)
+        start = end
+    
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(CASE_COLUMNS) * start * 8))
+    block = np.ndarray((len(CASE_COLUMNS), start), dtype=np.float64, buffer=shm.buf)
+    for segment, (begin, end) in layout.items():
+        for i, column in enumerate(CASE_COLUMNS):
+            block[i, begin:end] = data[segment][column]
+    
+    spec = {'name': shm.name, 'size': start, 'layout': layout,
+            'count': data['count'], 'other_error': data['other_error']}
+    return shm, spec
+
+def attach_arrays(spec):
+    """Attach to a block written by share_arrays; returns (shared memory, data dict of views)"""
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    block = np.ndarray((len(CASE_COLUMNS), spec['size']), dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    
+    data = {'count': spec['count'], 'other_error': spec['other_error']}
+    for segment, (begin, end) in spec['layout'].items():
+        data[segment] = {column: block[i, begin:end] for i, column in enumerate(CASE_COLUMNS)}
+    return shm, data
+
+_island_data = None
+
+def _init_island_worker(spec):
+    """Process pool initializer: attach each worker to the shared case arrays once"""
+    global _island_data
+    _island_data = attach_arrays(spec)
+
+def evolve_island(island, init, rng, bounds, param_names, generations, popsize=15, polish=False):
+    """Run one epoch of vectorized DE on an island; returns its final population, energies and RNG"""
+    _, data = _island_data
+    result = differential_evolution(
+        population_objective,
+        bounds,
+        args=(data, param_names),
+        maxiter=generations,
+        popsize=popsize,
+        seed=rng,
+        init=init,
+        polish=polish,
+        updating='deferred',
+        vectorized=True
+    )
+    return island, result.population, result.population_energies, rng, result.x, result.fun
+
+def migrate(populations, energies, migrants=ISLAND_MIGRANTS):
+    """Ring migration: each island's best individuals replace the next island's worst, in place"""
+    best = [np.argsort(island_energies)[:migrants] for island_energies in energies]
+    outgoing = [(populations[i][best[i]].copy(), energies[i][best[i]].copy()) for i in range(len(populations))]
+    for i, (individuals, individual_energies) in enumerate(outgoing):
+        target = (i + 1) % len(populations)
+        worst = np.argsort(energies[target])[-migrants:]
+        populations[target][worst] = individuals
+        energies[target][worst] = individual_energies
+
+def optimize_islands(data, bounds, param_names, islands, maxiter=300, popsize=15, seed=42, warm_params=None,
+                     epoch_generations=ISLAND_EPOCH_GENERATIONS, migrants=ISLAND_MIGRANTS):
+    """
+    Island-model DE: independent populations with different seeds evolve in separate processes
+    and exchange their best individuals around a ring every epoch_generations generations.
+    Workers read the case arrays from shared memory instead of receiving pickled copies.
+    Returns (optimized params, average error, winning island).
+    """
+    rngs = [np.random.RandomState(seed + island) for island in range(islands)]
+    populations = [None] * islands
+    energies = [None] * islands
+    if warm_params is not None:
+        center = [warm_params[name] for name in param_names]
+        populations = [warm_start_population(center, bounds, popsize, seed=seed + island) for island in range(islands)]
+    
+    epochs = max(1, -(-maxiter // epoch_generations))
+    shm, spec = share_arrays(data)
+    try:
+        with ProcessPoolExecutor(max_workers=min(islands, os.cpu_count() or 1),
+                                 initializer=_init_island_worker, initargs=(spec,)) as executor:
+            for epoch in range(epochs):
+                final = epoch == epochs - 1
+                futures = [
+                    executor.submit(evolve_island, island,
+                                    'latinhypercube' if populations[island] is None else populations[island],
+                                    rngs[island], bounds, param_names, epoch_generations, popsize, final)
+                    for island in range(islands)
+                ]
+                results = [future.result() for future in futures]
+                for island, population, population_energies, rng, x, fun in results:
+                    populations[island], energies[island], rngs[island] = population, population_energies, rng
+                
+                bests = [fun for _, _, _, _, _, fun in results]
+                print(f"Epoch {epoch + 1}/{epochs}: " + "  ".join(f"island {i} ${fun:.2f}" for i, fun in enumerate(bests)))
+                if not final and islands > 1:
+                    migrate(populations, energies, migrants)
+    finally:
+        shm.close()
+        shm.unlink()
+    
+    winner = int(np.argmin(bests))
+    _, _, _, _, x, fun = results[winner]
+    print(f"Best result from island {winner} of {islands} (${fun:.2f})")
+    return dict(zip(param_names, x)), fun, winner
+
+# Threshold parameters: (segment, case feature compared against, comparison that applies the adjustment)
+THRESHOLD_FEATURES = {
+    'day1_high_miles_threshold': ('day1', 'miles', '>'),
+    'day1_high_receipts_threshold': ('day1', 'receipts', '>'),
+    'day1_ratio_threshold': ('day1', 'ratio', '>'),
+    'day2_low_miles_threshold': ('day2', 'miles', '<'),
+    'day2_high_miles_threshold': ('day2', 'miles', '>'),
+    'day3_low_receipts_threshold': ('day3', 'receipts', '<'),
+    'day3_high_miles_threshold': ('day3', 'miles', '>'),
+    'day3_high_receipts_threshold': ('day3', 'receipts', '>'),
+    'day46_low_miles_threshold': ('day46', 'miles', '<'),
+    'day46_high_miles_threshold': ('day46', 'miles', '>'),
+    'day46_high_receipts_threshold': ('day46', 'receipts', '>'),
+    'day7_hustle_ratio_threshold': ('day7', 'ratio', '>'),
+    'day7_high_daily_spending_threshold': ('day7', 'daily_spending', '>'),
+    'day7_high_miles_threshold': ('day7', 'miles', '>'),
+    'day7_high_receipts_threshold': ('day7', 'receipts', '>'),
+}
+
+def sweep_threshold(name, params, data, bound):
+    """
+    Exact error-minimizing value of one threshold with all other parameters fixed.
+    The objective only changes when the threshold crosses an observed feature value, so the
+    segment's cases are sorted by that feature and every distinct split is scored at once
+    with cumulative sums of the errors with and without the adjustment applied.
+    Returns (best threshold, total segment error at that threshold).
+    """
+    segment, feature, comparison = THRESHOLD_FEATURES[name]
+    c = data[segment]
+    lower, upper = bound
+    
+    # Per-case error when the adjustment applies to every case ("on") and to none ("off")
+    always, never = (-np.inf, np.inf) if comparison == '>' else (np.inf, -np.inf)
+    errors_on = np.abs(SEGMENT_FUNCTIONS[segment]({**params, name: always}, c) - c['expected'])
+    errors_off = np.abs(SEGMENT_FUNCTIONS[segment]({**params, name: never}, c) - c['expected'])
+    
+    order = np.argsort(c[feature], kind='stable')
+    values = c[feature][order]
+    
+    # Split k puts the k smallest feature values on one side of the threshold,
+    # which lies between a_k (the k-th smallest value) and b_k (the next one)
+    a = np.concatenate(([-np.inf], values))
+    b = np.concatenate((values, [np.inf]))
+    if comparison == '>':
+        # Adjustment applies to values > threshold: threshold in [a_k, b_k), first k cases "off"
+        totals = (np.concatenate(([0.0], np.cumsum(errors_off[order])))
+                  + np.concatenate((np.cumsum(errors_on[order][::-1])[::-1], [0.0])))
+        low, high = np.maximum(a, lower), np.minimum(b, upper)
+        feasible = (low <= high) & (low < b)
+    else:
+        # Adjustment applies to values < threshold: threshold in (a_k, b_k], first k cases "on"
+        totals = (np.concatenate(([0.0], np.cumsum(errors_on[order])))
+                  + np.concatenate((np.cumsum(errors_off[order][::-1])[::-1], [0.0])))
+        low, high = np.maximum(a, lower), np.minimum(b, upper)
+        feasible = (low <= high) & (high > a)
+    
+    candidates = np.flatnonzero(feasible)
+    best = candidates[np.argmin(totals[candidates])]
+    
+    # Keep the current value if it already achieves the minimum
+    current = params[name]
+    current_total = np.abs(SEGMENT_FUNCTIONS[segment](params, c) - c['expected']).sum()
+    if current_total <= totals[best] + 1e-9:
+        return current, current_total
+    
+    return (low[best] + high[best]) / 2, totals[best]
+
+def polish_thresholds(params, data, bounds, param_names, max_passes=3):
+    """Sweep every threshold to its exact optimum, repeating until no threshold moves"""
+    params = dict(params)
+    bound_by_name = dict(zip(param_names, bounds))
+    original = dict(params)
+    
+    for _ in range(max_passes):
+        moved = False
+        for name in THRESHOLD_FEATURES:
+            new_value, _ = sweep_threshold(name, params, data, bound_by_name[name])
+            if new_value != params[name]:
+                params[name] = new_value
+                moved = True
+        if not moved:
+            break
+    
+    moves = [(name, original[name], params[name]) for name in THRESHOLD_FEATURES if params[name] != original[name]]
+    return params, moves
+
+# Joint and population runs checkpoint their DE state so an interrupted run can be resumed
+CHECKPOINT_FILE = 'optimizer_checkpoint.npz'
+CHECKPOINT_EVERY = 10  # generations
+
+def save_checkpoint(path, population, population_energies, x, fun, generation, rng, param_names):
+    """Atomically write the DE population, best vector, generation count and RNG state"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            population=population,
+            population_energies=population_energies,
+            x=x,
+            fun=fun,
+            generation=generation,
+            # The whole random state object is pickled so a resumed run draws the same numbers
+            rng_state=np.frombuffer(pickle.dumps(rng), dtype=np.uint8),
+            param_names=np.array(param_names)
+        )
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path, param_names):
+    """Load a checkpoint written by save_checkpoint for the same parameter set"""
+    with np.load(path) as checkpoint:
+        if list(checkpoint['param_names']) != list(param_names):
+            raise ValueError(f"{path} was written for a different parameter set")
+        return {
+            'population': checkpoint['population'],
+            'population_energies': checkpoint['population_energies'],
+            'x': checkpoint['x'],
+            'fun': float(checkpoint['fun']),
+            'generation': int(checkpoint['generation']),
+            'rng': pickle.loads(checkpoint['rng_state'].tobytes()),
+        }
+
+def make_checkpoint_callback(path, rng, param_names, start_generation=0, every=CHECKPOINT_EVERY):
+    """DE callback that checkpoints every `every` generations, counting from start_generation"""
+    def callback(intermediate_result):
+        generation = start_generation + intermediate_result.nit
+        if generation % every == 0:
+            save_checkpoint(path, intermediate_result.population, intermediate_result.population_energies,
+                            intermediate_result.x, intermediate_result.fun, generation, rng, param_names)
+    return callback
+
+def truncate_telemetry(path, generation):
+    """Drop the telemetry records of generations after `generation` from a JSONL file"""
+    with open(path, 'r') as f:
+        lines = [line for line in f if line.strip() and json.loads(line)['generation'] <= generation]
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, path)
+
+def make_telemetry_callback(path, data, bounds, param_names, start_generation=0, vectorized=False):
+    """
+    DE callback appending one JSONL record per generation to path (tail it while the run goes):
+    best and median objective, evaluations per second, wall time, per-segment error of the
+    current best and population diversity (mean per-parameter std as a fraction of bound width).
+    With vectorized=True scipy counts one evaluation per population call, so evaluations are
+    counted as calls times population size. When resuming (start_generation > 0), records
+    after start_generation, left by the run that continued past its last checkpoint, are
+    dropped first so no generation is recorded twice.
+    """
+    if start_generation and os.path.exists(path):
+        truncate_telemetry(path, start_generation)
+    
+    lower, upper = np.array(bounds, dtype=float).T
+    width = np.where(upper > lower, upper - lower, 1.0)
+    start_time = last_time = time.time()
+    last_nfev = 0
+    
+    def callback(intermediate_result):
+        nonlocal last_time, last_nfev
+        now = time.time()
+        generation_seconds = now - last_time
+        evaluations = intermediate_result.nfev - last_nfev
+        if vectorized:
+            evaluations *= len(intermediate_result.population)
+        last_time, last_nfev = now, intermediate_result.nfev
+        
+        best = dict(zip(param_names, intermediate_result.x))
+        record = {
+            'generation': start_generation + intermediate_result.nit,
+            'elapsed': round(now - start_time, 3),
+            'generation_seconds': round(generation_seconds, 4),
+            'best': float(intermediate_result.fun),
+            'median': float(np.median(intermediate_result.population_energies)),
+            'evals_per_second': round(evaluations / generation_seconds, 1) if generation_seconds > 0 else None,
+            'nfev': int(intermediate_result.nfev),
+            'segment_errors': {segment: float(segment_total_error(segment, best, data) / data['count'])
+                               for segment in SEGMENTS},
+            'diversity': float(np.mean(np.std(intermediate_result.population, axis=0) / width)),
+        }
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+    return callback
+
+def chain_callbacks(*callbacks):
+    """Combine DE callbacks into one; the run stops if any of them returns True"""
+    callbacks = [callback for callback in callbacks if callback is not None]
+    
+    # scipy passes an OptimizeResult only to callbacks whose parameter is named intermediate_result
+    def callback(intermediate_result):
+        stop = False
+        for cb in callbacks:
+            stop = bool(cb(intermediate_result)) or stop
+        return stop
+    return callback
+
+def warm_start_population(center, bounds, popsize=15, spread=0.05, seed=42):
+    """
+    Initial DE population around a known parameter vector: the vector itself plus Gaussian
+    perturbations of `spread` times each bound's width, clipped to the bounds.
+    """
+    lower, upper = np.array(bounds, dtype=float).T
+    center = np.clip(np.asarray(center, dtype=float), lower, upper)
+    rng = np.random.default_rng(seed)
+    population = center + rng.normal(0.0, spread, (popsize * len(bounds), len(bounds))) * (upper - lower)
+    population[0] = center
+    return np.clip(population, lower, upper)
+
+def optimize_parameters(population=False, segmented=False, warm_start=False, resume=False,
+                        checkpoint_path=CHECKPOINT_FILE, telemetry_path=None, halving=False, islands=0):
     """Main optimization function"""
     print("Loading data...")
-    cases = load_data()
-    print(f"Loaded {len(cases)} cases")
+    columns = load_data()
+    print(f"Loaded {len(columns['days'])} cases")
     
     print("Setting up optimization...")
     initial_params = get_initial_parameters()
@@ -359,35 +941,116 @@ def optimize_parameters():
     # Convert initial params to array
     initial_values = [initial_params[name] for name in param_names]
     
+    data = load_arrays(columns)
+    
     # Calculate baseline performance
-    baseline_error = objective_function(initial_values, cases, param_names)
+    baseline_error = vectorized_objective(initial_values, data, param_names)
     print(f"Baseline average error: ${baseline_error:.2f}")
     
     print(f"Optimizing {len(param_names)} parameters...")
-    print("This may take several minutes...")
+    
+    # Starting population: resumed from a checkpoint, seeded around the known optimum, or Latin hypercube
+    init = 'latinhypercube'
+    rng = np.random.RandomState(42)
+    start_generation = 0
+    warm_params = None
+    if resume:
+        checkpoint = load_checkpoint(checkpoint_path, param_names)
+        init = checkpoint['population']
+        rng = checkpoint['rng']
+        start_generation = checkpoint['generation']
+        print(f"Resuming from {checkpoint_path} at generation {start_generation} (best ${checkpoint['fun']:.2f})")
+    elif warm_start:
+        from generate_optimized_reimbursement import get_optimized_parameters
+        warm_params = get_optimized_parameters()
+        init = warm_start_population([warm_params[name] for name in param_names], bounds)
+        warm_error = vectorized_objective(init[0], data, param_names)
+        print(f"Warm-starting around get_optimized_parameters() (average error ${warm_error:.2f})")
+    
+    callback = make_checkpoint_callback(checkpoint_path, rng, param_names, start_generation)
+    if telemetry_path:
+        print(f"Appending per-generation telemetry to {telemetry_path}")
+        callback = chain_callbacks(callback, make_telemetry_callback(telemetry_path, data, bounds, param_names,
+                                                                     start_generation, vectorized=population or halving))
+    maxiter = max(300 - start_generation, 1)
     
     start_time = time.time()
     
     # Use differential evolution for global optimization
-    result = differential_evolution(
-        objective_function,
-        bounds,
-        args=(cases, param_names),
-        maxiter=300,
-        popsize=15,
-        seed=42,
-        disp=True,
-        workers=1
-    )
+    if segmented:
+        print("Optimizing duration segments as independent subproblems")
+        optimized_params, optimized_error = optimize_segments(data, bounds, param_names, warm_params=warm_params)
+    elif islands:
+        print(f"Running {islands} DE islands with ring migration every {ISLAND_EPOCH_GENERATIONS} generations")
+        optimized_params, optimized_error, _ = optimize_islands(data, bounds, param_names, islands,
+                                                                warm_params=warm_params)
+    elif population or halving:
+        # Score each generation's whole trial population in one broadcast call
+        print("Evaluating whole populations per call (vectorized, deferred updating)")
+        objective, objective_args = population_objective, (data, param_names)
+        if halving:
+            index = build_segment_index(columns)
+            rungs = [load_arrays(stratified_sample(index, samples)) for samples in HALVING_SAMPLES_PER_DURATION] + [data]
+            objective, halving_stats = make_halving_objective(rungs, param_names)
+            objective_args = ()
+            print(f"Successive halving on {' → '.join(str(rung['count']) for rung in rungs)} cases, "
+                  f"keeping the best 1/{HALVING_ETA} per rung")
+        result = differential_evolution(
+            objective,
+            bounds,
+            args=objective_args,
+            maxiter=maxiter,
+            popsize=15,
+            seed=rng,
+            init=init,
+            callback=callback,
+            disp=True,
+            updating='deferred',
+            vectorized=True
+        )
+    else:
+        result = differential_evolution(
+            vectorized_objective,
+            bounds,
+            args=(data, param_names),
+            maxiter=maxiter,
+            popsize=15,
+            seed=rng,
+            init=init,
+            callback=callback,
+            disp=True,
+            workers=1
+        )
+    
+    if halving:
+        saved = 1 - halving_stats['case_evaluations'] / halving_stats['full_case_evaluations']
+        print(f"Successive halving scored {halving_stats['case_evaluations']:,} case evaluations "
+              f"instead of {halving_stats['full_case_evaluations']:,} ({saved:.0%} saved)")
+    
+    if not (segmented or islands):
+        optimized_params = dict(zip(param_names, result.x))
+        optimized_error = result.fun
+        # The run finished, so its checkpoint is no longer needed
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+    
+    # Polish thresholds with an exact breakpoint sweep (DE cannot see that only data values matter)
+    de_error = optimized_error
+    optimized_params, moves = polish_thresholds(optimized_params, data, bounds, param_names)
+    optimized_error = vectorized_objective([optimized_params[name] for name in param_names], data, param_names)
+    
+    print(f"\nThreshold breakpoint sweep: ${de_error:.2f} → ${optimized_error:.2f}")
+    print("-" * 50)
+    for name, old_val, new_val in moves:
+        print(f"{name}: {old_val:.3f} → {new_val:.3f} ({new_val - old_val:+.3f})")
+    if not moves:
+        print("All thresholds already at an optimal breakpoint")
     
     end_time = time.time()
     
     print(f"\nOptimization completed in {end_time - start_time:.1f} seconds")
-    print(f"Optimized average error: ${result.fun:.2f}")
-    print(f"Improvement: ${baseline_error - result.fun:.2f} ({(baseline_error - result.fun) / baseline_error * 100:.1f}%)")
-    
-    # Create optimized parameters dictionary
-    optimized_params = dict(zip(param_names, result.x))
+    print(f"Optimized average error: ${optimized_error:.2f}")
+    print(f"Improvement: ${baseline_error - optimized_error:.2f} ({(baseline_error - optimized_error) / baseline_error * 100:.1f}%)")
     
     # Show significant parameter changes
     print(f"\nSignificant parameter changes:")
@@ -423,7 +1086,43 @@ def optimize_parameters():
         print(f"  Improvement: ${improvement:.2f}")
         print()
     
-    return optimized_params, baseline_error, result.fun
+    return optimized_params, baseline_error, optimized_error
 
 if __name__ == "__main__":
-    optimized_params, baseline_error, optimized_error = optimize_parameters() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Optimize the parameterized reimbursement model with differential evolution")
+    parser.add_argument('--population', action='store_true',
+                        help="Score each generation's candidates in one broadcast (candidates x cases) call")
+    parser.add_argument('--segmented', action='store_true',
+                        help="Optimize each duration segment separately and in parallel, then merge")
+    parser.add_argument('--halving', action='store_true',
+                        help="Screen trial candidates on stratified subsamples before scoring survivors on all cases")
+    parser.add_argument('--islands', type=int, default=0, metavar='N',
+                        help="Run N migrating DE populations in parallel processes (island model)")
+    parser.add_argument('--warm-start', action='store_true',
+                        help="Seed the population around generate_optimized_reimbursement.get_optimized_parameters()")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted joint or --population run from its checkpoint")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE,
+                        help=f"Checkpoint file, written every {CHECKPOINT_EVERY} generations (default: {CHECKPOINT_FILE})")
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help="Append one JSONL record per generation to FILE (joint and --population runs)")
+    args = parser.parse_args()
+    if args.islands and (args.segmented or args.halving or args.resume or args.telemetry):
+        parser.error("--islands cannot be combined with --segmented, --halving, --resume or --telemetry")
+    if args.halving and args.segmented:
+        parser.error("--halving cannot be combined with --segmented")
+    if args.telemetry and args.segmented:
+        parser.error("--telemetry cannot be combined with --segmented")
+    if args.resume and (args.segmented or args.warm_start):
+        parser.error("--resume cannot be combined with --segmented or --warm-start")
+    if args.resume and not os.path.exists(args.checkpoint):
+        parser.error(f"no checkpoint found at {args.checkpoint}")
+    
+    optimized_params, baseline_error, optimized_error = optimize_parameters(population=args.population,
+                                                                            segmented=args.segmented,
+                                                                            warm_start=args.warm_start,
+                                                                            resume=args.resume,
+                                                                            checkpoint_path=args.checkpoint,
+                                                                            telemetry_path=args.telemetry,
+                                                                            halving=args.halving,
+                                                                            islands=args.islands) 
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import time
+from collections import namedtuple
+
+# README: run.sh must finish in under 5 seconds per test case
+DEFAULT_TIMEOUT = 5.0
+
+# Fields in the line-oriented output are separated by the ASCII unit separator
+# so that empty fields survive bash's `read`.
+FIELD_SEPARATOR = '\x1f'
+
+RunResult = namedtuple('RunResult', ['status', 'stdout', 'stderr', 'returncode', 'elapsed'])
+
+async def _run_case(script, args, semaphore, timeout):
+    """Run one black-box invocation once, capturing stdout and stderr together"""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            # A new session lets us kill the whole process group (run.sh plus its children) on timeout
+            proc = await asyncio.create_subprocess_exec(
+                script, *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+        except OSError as e:
+            return RunResult('error', '', str(e), None, time.perf_counter() - start)
+
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            stdout, stderr = await proc.communicate()
+            message = stderr.decode(errors='replace') + f"Timed out after {timeout:g}s"
+            return RunResult('timeout', stdout.decode(errors='replace'), message,
+                             proc.returncode, time.perf_counter() - start)
+
+        status = 'ok' if proc.returncode == 0 else 'error'
+        return RunResult(status, stdout.decode(errors='replace'), stderr.decode(errors='replace'),
+                         proc.returncode, time.perf_counter() - start)
+
+async def run_cases_async(cases, script='./run.sh', slots=None, timeout=DEFAULT_TIMEOUT):
+    """Run script once per case with at most `slots` concurrent processes.
+
+    cases is a sequence of argument tuples, e.g. (days, miles, receipts).
+    Results are returned in input order.
+    """
+    semaphore = asyncio.Semaphore(slots or os.cpu_count() or 1)
+    tasks = [_run_case(script, [str(arg) for arg in case], semaphore, timeout) for case in cases]
+    return await asyncio.gather(*tasks)
+
+def run_cases(cases, script='./run.sh', slots=None, timeout=DEFAULT_TIMEOUT):
+    """Synchronous wrapper around run_cases_async"""
+    return asyncio.run(run_cases_async(cases, script, slots, timeout))
+
+def format_result(result):
+    """Format a result as one line: status, whitespace-free stdout and single-line stderr"""
+    output = ''.join(result.stdout.split())
+    error = ' '.join(result.stderr.replace(FIELD_SEPARATOR, ' ').splitlines())
+    return FIELD_SEPARATOR.join([result.status, output, error])
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a black-box run.sh over colon-separated cases read from stdin, in parallel")
+    parser.add_argument('--script', default='./run.sh', help="Executable to run per case (default: ./run.sh)")
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="Maximum concurrent invocations (default: number of cores)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Per-case timeout in seconds (default: {DEFAULT_TIMEOUT:g})")
+    args = parser.parse_args()
+
+    # Input lines look like eval.sh's test data: days:miles:receipts[:expected]
+    cases = []
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            cases.append(line.split(':')[:3])
+
+    results = run_cases(cases, args.script, args.jobs or None, args.timeout)
+    for result in results:
+        print(format_result(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Tiny client for prediction_daemon.py. It deliberately imports nothing heavy:
+# a prediction costs one Unix socket round trip while the daemon is running.
+
+import hashlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKENDS = ('xgboost', 'rules')
+
+# How long a client spends on the daemon in total, including starting it and waiting for
+# it to load the model, before predicting in-process. Together with the in-process fallback
+# this stays well inside run.sh's 5-second per-case budget.
+DAEMON_BUDGET = 2.0
+
+def default_socket_path():
+    """Socket path for this checkout (override with REIMBURSEMENT_DAEMON_SOCKET)"""
+    path = os.environ.get('REIMBURSEMENT_DAEMON_SOCKET')
+    if path:
+        return path
+    # Unix socket paths are limited to ~100 bytes, so use a short per-user, per-checkout name
+    digest = hashlib.sha1(REPO_DIR.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"reimbursement-{os.getuid()}-{digest}.sock")
+
+def send_command(command, socket_path=None, timeout=DAEMON_BUDGET):
+    """Send one command line to the daemon and return its reply line"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(command.encode() + b'\n')
+        with sock.makefile('r') as reply:
+            return reply.readline().rstrip('\n')
+
+def start_daemon(socket_path=None):
+    """Start prediction_daemon.py in the background, detached from this process"""
+    command = [sys.executable, os.path.join(REPO_DIR, 'prediction_daemon.py'),
+               '--socket', socket_path or default_socket_path()]
+    subprocess.Popen(command, cwd=REPO_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+
+def predict_in_process(backend, days, miles, receipts):
+    """Fallback used when the daemon cannot be reached"""
+    from prediction_daemon import predict
+    return predict(backend, days, miles, receipts)
+
+def precomputed_prediction(days, miles, receipts):
+    """Prediction from xgboost_predictions.json however the inputs are written, or None.
+
+    run.sh's jq lookup misses inputs such as 3.60 that are stored as 3.6; the canonical-key
+    index finds them without the daemon. Like run.sh, predictions with a metadata sidecar
+    are only used while it names the current model.
+    """
+    import json
+    from prediction_cache import current_model_sha256
+    from prediction_index import (INDEX_FILE, PREDICTIONS_FILE, PREDICTIONS_METADATA_FILE, ensure_index,
+                                  format_prediction, lookup, open_index)
+    predictions_file = os.path.join(REPO_DIR, PREDICTIONS_FILE)
+    metadata_file = os.path.join(REPO_DIR, PREDICTIONS_METADATA_FILE)
+    if not os.path.exists(predictions_file):
+        return None
+    if os.path.exists(metadata_file):
+        with open(metadata_file, 'r') as f:
+            if json.load(f)['model_sha256'] != current_model_sha256():
+                return None
+
+    index_file = os.path.join(REPO_DIR, INDEX_FILE)
+    ensure_index(predictions_file, index_file)
+    prediction = lookup(open_index(index_file), days, miles, receipts)
+    return None if prediction is None else format_prediction(prediction)
+
+def predict(backend, days, miles, receipts, socket_path=None):
+    """Predict through the daemon, starting it on first use and falling back to in-process prediction"""
+    if backend == 'xgboost':
+        prediction = precomputed_prediction(days, miles, receipts)
+        if prediction is not None:
+            return prediction
+
+    command = f"predict {backend} {days} {miles} {receipts}"
+    deadline = time.monotonic() + DAEMON_BUDGET
+
+    reply = None
+    try:
+        reply = send_command(command, socket_path)
+    except socket.timeout:
+        # The daemon is busy or still warming up: do not wait any longer for it
+        pass
+    except OSError as e:
+        # Only a missing socket or one nobody listens on means there is no daemon; other errors
+        # (e.g. a full listen queue under parallel load) are retried without starting another
+        if isinstance(e, (FileNotFoundError, ConnectionRefusedError)):
+            start_daemon(socket_path)
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                reply = send_command(command, socket_path, timeout=max(deadline - time.monotonic(), 0.01))
+                break
+            except socket.timeout:
+                break
+            except OSError:
+                continue
+
+    if not reply or reply.startswith('error'):
+        return predict_in_process(backend, days, miles, receipts)
+    return reply
+
+def main():
+    args = sys.argv[1:]
+    backend = 'xgboost'
+    if len(args) >= 2 and args[0] == '--backend':
+        backend = args[1]
+        args = args[2:]
+
+    if args == ['--shutdown']:
+        try:
+            print(send_command('shutdown'))
+        except OSError:
+            print("Prediction daemon is not running")
+        return
+
+    if len(args) != 3 or backend not in BACKENDS:
+        print("Usage: predict_client.py [--backend xgboost|rules] <trip_duration_days> <miles_traveled> <total_receipts_amount>")
+        print("       predict_client.py --shutdown")
+        sys.exit(1)
+
+    print(predict(backend, *args))
+
+if __name__ == "__main__":
+    main()
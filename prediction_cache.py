@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# Precomputed predictions for any case file, keyed by the content hash of the model
+# that made them. prediction_daemon.py answers from here before predicting, and
+# lookups never serve entries from another model.
+
+import json
+import os
+import sys
+from prediction_index import canonical_key, lookup, open_index, write_index
+from stream_io import parse_line
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(REPO_DIR, 'prediction_cache')
+
+# Every case file cached so far, so a new model's cache covers them all again
+SOURCES_FILE = os.path.join(CACHE_DIR, 'sources.json')
+
+# Case files that are always cached
+DEFAULT_CASE_FILES = ('public_cases.json', 'private_cases.json')
+
+def current_model_sha256():
+    """Content hash of the model xgboost_solution would serve, without importing it.
+
+    Mirrors xgboost_solution.default_model_path: the native model's hash comes from
+    its metadata sidecar, a legacy pickle is hashed directly. None if there is no model.
+    """
+    model_path = os.path.join(REPO_DIR, 'xgboost_model.ubj')
+    legacy_path = os.path.join(REPO_DIR, 'xgboost_model.pkl')
+    if os.path.exists(model_path):
+        with open(os.path.splitext(model_path)[0] + '.meta.json', 'r') as f:
+            return json.load(f)['sha256']
+    if os.path.exists(legacy_path):
+        import hashlib
+        with open(legacy_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    return None
+
+def cache_path(model_sha256):
+    """Index file holding the predictions of the model with this hash"""
+    return os.path.join(CACHE_DIR, f"{model_sha256}.idx")
+
+def read_cases(filename):
+    """(days, miles, receipts) tuples from a public or private JSON file, or a JSONL / 'days miles receipts' file"""
+    with open(filename, 'r') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        # JSON case files go through the shared loader (only needed when building, not for lookups)
+        from cases import as_inputs, load_columns
+        inputs = as_inputs(load_columns(filename))
+        return [(case['trip_duration_days'], case['miles_traveled'], case['total_receipts_amount']) for case in inputs]
+    return [parse_line(line) for line in text.splitlines() if line.strip()]
+
+def read_entries(index_file, model_sha256):
+    """{canonical key: prediction} of an existing cache file, or {} if missing or made by another model"""
+    if not os.path.exists(index_file):
+        return {}
+    keys, values, digest = open_index(index_file)
+    if digest != bytes.fromhex(model_sha256):
+        return {}
+    return dict(zip(keys, values))
+
+def cached_case_files():
+    """Absolute paths of the default case files and of every file cached before that still exists"""
+    case_files = [os.path.join(REPO_DIR, filename) for filename in DEFAULT_CASE_FILES]
+    if os.path.exists(SOURCES_FILE):
+        with open(SOURCES_FILE, 'r') as f:
+            case_files += json.load(f)
+    return [filename for filename in dict.fromkeys(case_files) if os.path.exists(filename)]
+
+def build_cache(case_files=()):
+    """Batch-predict every case in case_files and in all previously cached files into the current model's cache file.
+
+    Entries already cached for the same model are kept; caches of other models are deleted
+    once their case files have been predicted again. Returns (cache file, number of entries).
+    """
+    from xgboost_solution import load_model_data, predict_chunk
+    model_sha256 = load_model_data()['sha256']
+    index_file = cache_path(model_sha256)
+    case_files = list(dict.fromkeys(cached_case_files() + [os.path.abspath(filename) for filename in case_files]))
+
+    entries = read_entries(index_file, model_sha256)
+    for filename in case_files:
+        cases = read_cases(filename)
+        if not cases:
+            continue
+        # predict_chunk formats exactly like predict_single, so cache hits print the same numbers
+        for case, prediction in zip(cases, predict_chunk(cases)):
+            packed = canonical_key(*case)
+            if packed is not None:
+                entries[packed] = float(prediction)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    count = write_index(entries, bytes.fromhex(model_sha256), index_file)
+    tmp_file = f"{SOURCES_FILE}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(case_files, f, indent=2)
+    os.replace(tmp_file, SOURCES_FILE)
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith('.idx') and os.path.join(CACHE_DIR, name) != index_file:
+            os.remove(os.path.join(CACHE_DIR, name))
+    return index_file, count
+
+def ensure_cache():
+    """Rebuild the cache if the current model has none or it is missing any cached case file's cases; True if rebuilt"""
+    model_sha256 = current_model_sha256()
+    if model_sha256 is None:
+        return False
+    entries = read_entries(cache_path(model_sha256), model_sha256)
+    if entries and all(canonical_key(*case) in entries
+                       for filename in cached_case_files()
+                       for case in read_cases(filename)):
+        return False
+    build_cache()
+    return True
+
+def cached_prediction(days, miles, receipts):
+    """Cached prediction of the current model, or None on a miss or if only older models' caches exist"""
+    model_sha256 = current_model_sha256()
+    if model_sha256 is None or not os.path.exists(cache_path(model_sha256)):
+        return None
+    index = open_index(cache_path(model_sha256))
+    # The file name says which model it belongs to; the header digest makes sure
+    if index[2] != bytes.fromhex(model_sha256):
+        return None
+    return lookup(index, days, miles, receipts)
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ['build']:
+        case_files = [os.path.abspath(filename) for filename in args[1:]]
+        # Load the model the same way prediction_daemon.py does, from the repository directory
+        os.chdir(REPO_DIR)
+        index_file, count = build_cache(case_files)
+        print(f"✅ Cached {count} predictions from {', '.join(cached_case_files())} in {index_file}")
+    else:
+        print("Usage: prediction_cache.py build [case_file ...]")
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
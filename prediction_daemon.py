@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import argparse
+import fcntl
+import os
+import socketserver
+import threading
+from predict_client import REPO_DIR, default_socket_path
+from stream_io import parse_case
+
+# Exit after this many seconds without a request so a forgotten daemon does not linger
+DEFAULT_IDLE_TIMEOUT = 1800
+
+def predict(backend, days, miles, receipts):
+    """Predict one case and return it formatted exactly like the backend's command line output"""
+    days, miles, receipts = parse_case(days, miles, receipts)
+    if backend == 'xgboost':
+        from prediction_cache import cache_path, cached_prediction, current_model_sha256
+        from xgboost_solution import predict_single
+        prediction = cached_prediction(days, miles, receipts)
+        if prediction is not None:
+            return str(prediction)
+        # The model changed since the cache was built: the daemon predicts directly while it is rebuilt
+        model_sha256 = current_model_sha256()
+        if _serving and model_sha256 is not None and not os.path.exists(cache_path(model_sha256)):
+            refresh_cache()
+        return str(predict_single(days, miles, receipts))
+    if backend == 'rules':
+        from reimbursement import calculate_reimbursement
+        return str(calculate_reimbursement(days, miles, receipts))
+    raise ValueError(f"Unknown backend: {backend}")
+
+# Held while the prediction cache is being rebuilt, so only one rebuild runs at a time
+_cache_lock = threading.Lock()
+
+# Set by serve(); in-process fallbacks in predict_client.py exit too soon to rebuild the cache
+_serving = False
+
+def refresh_cache():
+    """Rebuild the prediction cache in a background thread if it is incomplete for the current model"""
+    if not _cache_lock.acquire(blocking=False):
+        return
+
+    def rebuild():
+        from prediction_cache import ensure_cache
+        try:
+            ensure_cache()
+        finally:
+            _cache_lock.release()
+
+    threading.Thread(target=rebuild, daemon=True).start()
+
+def warm_up():
+    """Import the prediction modules and load the model before the first request arrives.
+
+    The prediction cache is checked (and rebuilt if the model has changed) in the background,
+    so requests are served meanwhile.
+    """
+    import reimbursement
+    from xgboost_solution import default_model_path, load_model_data
+    if os.path.exists(default_model_path()):
+        load_model_data()
+        refresh_cache()
+
+class PredictionHandler(socketserver.StreamRequestHandler):
+    """Line protocol: 'predict <backend> <days> <miles> <receipts>', 'ping' or 'shutdown'"""
+
+    def handle(self):
+        for line in self.rfile:
+            parts = line.decode().split()
+            if not parts:
+                continue
+
+            if parts[0] == 'shutdown':
+                self.wfile.write(b'Prediction daemon stopped\n')
+                self.server.running = False
+                return
+            elif parts[0] == 'ping':
+                reply = 'pong'
+            elif parts[0] == 'predict' and len(parts) == 5:
+                try:
+                    reply = predict(*parts[1:])
+                except Exception as e:
+                    reply = f"error {e}"
+            else:
+                reply = f"error Unknown command: {line.decode().strip()}"
+
+            self.wfile.write(reply.encode() + b'\n')
+            self.wfile.flush()
+
+class PredictionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # One thread per connection, and a listen queue deep enough for parallel_runner.py's
+    # concurrent clients (the default of 5 makes their connects fail with EAGAIN)
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_timeout(self):
+        self.running = False
+
+def serve(socket_path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Serve predictions on a Unix socket until shut down or idle for idle_timeout seconds"""
+    # Only one daemon per socket: concurrent first-use clients may all try to start one
+    lock_file = open(socket_path + '.lock', 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return
+
+    global _serving
+    _serving = True
+    os.chdir(REPO_DIR)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    # Bind before warming up so clients started meanwhile queue on the socket instead of falling back
+    server = PredictionServer(socket_path, PredictionHandler)
+    warm_up()
+    server.timeout = idle_timeout
+    server.running = True
+    try:
+        while server.running:
+            server.handle_request()
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+        lock_file.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long-lived prediction daemon for run.sh")
+    parser.add_argument('--socket', default=default_socket_path(), help="Unix socket path to listen on")
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help=f"Exit after this many idle seconds (default: {DEFAULT_IDLE_TIMEOUT})")
+    args = parser.parse_args()
+
+    serve(args.socket, args.idle_timeout)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# Sorted binary index over xgboost_predictions.json, keyed on the canonical value of the
+# inputs. run.sh looks predictions up with jq by their exact string key; predict_client.py,
+# which run.sh falls back to, then finds inputs written differently (3.60 for 3.6) here
+# before it contacts the daemon. Stdlib only: a lookup memory-maps the index and
+# binary-searches it instead of parsing the whole JSON file.
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+from array import array
+from decimal import Decimal, InvalidOperation
+
+PREDICTIONS_FILE = 'xgboost_predictions.json'
+INDEX_FILE = 'xgboost_predictions.idx'
+
+# Sidecar recording the content hash of the model that made PREDICTIONS_FILE (absent for legacy files)
+PREDICTIONS_METADATA_FILE = 'xgboost_predictions.meta.json'
+
+# Header: magic, format version, entry count, SHA-256 of the source (the JSON file,
+# or the model for prediction_cache.py).
+# It is followed by `count` sorted uint64 keys and `count` float64 predictions.
+MAGIC = b'RIDX'
+VERSION = 1
+HEADER = struct.Struct('<4sIQ32s')
+
+# Keys pack (days, miles in hundredths, receipts in cents) into one uint64
+MILES_BITS = 27
+CENTS_BITS = 27
+DAYS_BITS = 64 - MILES_BITS - CENTS_BITS
+
+def hundredths(value):
+    """Exact integer hundredths of a number or numeric string, or None if it has finer precision"""
+    try:
+        scaled = Decimal(str(value)) * 100
+    except InvalidOperation:
+        return None
+    if scaled != scaled.to_integral_value() or scaled < 0:
+        return None
+    return int(scaled)
+
+def canonical_key(days, miles, receipts):
+    """Integer key for a case, or None if it cannot be represented.
+
+    '3.6' and '3.60' give the same key, unlike the old "{days}_{miles}_{receipts}" string keys.
+    """
+    days = hundredths(days)
+    miles = hundredths(miles)
+    cents = hundredths(receipts)
+    if days is None or miles is None or cents is None or days % 100:
+        return None
+    days //= 100
+    if days >= 1 << DAYS_BITS or miles >= 1 << MILES_BITS or cents >= 1 << CENTS_BITS:
+        return None
+    return (days << (MILES_BITS + CENTS_BITS)) | (miles << CENTS_BITS) | cents
+
+def format_prediction(value):
+    """Format a prediction exactly as `jq -r` prints the JSON number (no trailing .0)"""
+    text = repr(float(value))
+    return text[:-2] if text.endswith('.0') else text
+
+def build_index(predictions_file=PREDICTIONS_FILE, index_file=INDEX_FILE):
+    """Write the sorted binary index for a {"days_miles_receipts": prediction} JSON file"""
+    # Only building needs these; lookups skip importing them
+    import hashlib
+    import json
+    with open(predictions_file, 'rb') as f:
+        payload = f.read()
+    predictions = json.loads(payload)
+
+    entries = {}
+    for key, prediction in predictions.items():
+        parts = key.split('_')
+        packed = canonical_key(*parts) if len(parts) == 3 else None
+        if packed is None:
+            raise ValueError(f"Cannot index key {key!r} in {predictions_file}")
+        if packed in entries and entries[packed] != prediction:
+            raise ValueError(f"Key {key!r} in {predictions_file} conflicts with an equivalent key")
+        entries[packed] = prediction
+
+    return write_index(entries, hashlib.sha256(payload).digest(), index_file)
+
+def write_index(entries, digest, index_file):
+    """Write {canonical key: prediction} entries as an index whose header records a 32-byte digest"""
+    keys = array('Q', sorted(entries))
+    values = array('d', (entries[key] for key in keys))
+
+    # Write to a temporary file first so concurrent lookups never see a partial index
+    tmp_file = f"{index_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys), digest))
+        keys.tofile(f)
+        values.tofile(f)
+    os.replace(tmp_file, index_file)
+    return len(keys)
+
+def open_index(index_file=INDEX_FILE):
+    """Memory-map an index; returns (keys, values, source digest) as zero-copy views"""
+    with open(index_file, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, count, digest = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{index_file} is not a version {VERSION} prediction index")
+    view = memoryview(mapped)
+    keys_end = HEADER.size + 8 * count
+    keys = view[HEADER.size:keys_end].cast('Q')
+    values = view[keys_end:keys_end + 8 * count].cast('d')
+    return keys, values, digest
+
+def lookup(index, days, miles, receipts):
+    """Prediction for a case, or None if it is not in the index"""
+    keys, values, _ = index
+    packed = canonical_key(days, miles, receipts)
+    if packed is None:
+        return None
+    position = bisect.bisect_left(keys, packed)
+    if position < len(keys) and keys[position] == packed:
+        return values[position]
+    return None
+
+def ensure_index(predictions_file=PREDICTIONS_FILE, index_file=INDEX_FILE):
+    """Build the index if it is missing or older than the predictions file"""
+    if not os.path.exists(index_file) or os.path.getmtime(index_file) < os.path.getmtime(predictions_file):
+        build_index(predictions_file, index_file)
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ['build'] and len(args) <= 3:
+        predictions_file = args[1] if len(args) > 1 else PREDICTIONS_FILE
+        index_file = args[2] if len(args) > 2 else INDEX_FILE
+        count = build_index(predictions_file, index_file)
+        print(f"Indexed {count} predictions from {predictions_file} into {index_file}")
+    else:
+        print("Usage: prediction_index.py build [predictions.json] [index_file]")
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
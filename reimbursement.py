@@ -1,3 +1,5 @@
+import numpy as np
+
 def calculate_reimbursement(trip_duration_days: int, miles_traveled: int, total_receipts_amount: float) -> float:
     """
     Scientifically optimized reimbursement calculation using differential evolution.
@@ -168,3 +170,122 @@ def calculate_7_plus_day_trip(trip_duration_days: int, miles_traveled: int, tota
         reimbursement = cap
 
     return max(0, round(reimbursement, 2))
+
+def round_like_python(values):
+    """
+    Vectorized round(x, 2) with Python's exact semantics.
+    np.round scales by 100 in binary floating point, which can land on the other side
+    of a .5 boundary; those few near-tie values are rounded with the builtin instead.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, 2) for value in values[near_tie].tolist()]
+    return rounded
+
+def calculate_reimbursement_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """
+    Vectorized calculate_reimbursement over NumPy arrays.
+    Cases are dispatched to each duration segment with masks, and every threshold
+    becomes an np.where multiplier applied in the same order as the scalar code,
+    so results are bit-identical to calling calculate_reimbursement per case.
+    """
+    days = np.asarray(trip_duration_days)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+    
+    reimbursement = np.zeros(days.shape, dtype=np.float64)
+    valid = days >= 1
+    
+    mask = days == 1
+    reimbursement[mask] = calculate_1_day_trip_batch(miles[mask], receipts[mask])
+    mask = days == 2
+    reimbursement[mask] = calculate_2_day_trip_batch(miles[mask], receipts[mask])
+    mask = days == 3
+    reimbursement[mask] = calculate_3_day_trip_batch(miles[mask], receipts[mask])
+    mask = (days >= 4) & (days <= 6)
+    reimbursement[mask] = calculate_4_6_day_trip_batch(days[mask], miles[mask], receipts[mask])
+    mask = days >= 7
+    reimbursement[mask] = calculate_7_plus_day_trip_batch(days[mask], miles[mask], receipts[mask])
+    
+    # Every segment ends with max(0, round(reimbursement, 2)); other durations return 0.0
+    rounded = round_like_python(reimbursement)
+    return np.where(valid & (rounded > 0), rounded, 0.0)
+
+def calculate_1_day_trip_batch(miles_traveled, total_receipts_amount):
+    """Vectorized calculate_1_day_trip before rounding"""
+    reimbursement = (miles_traveled * 0.5006) + (total_receipts_amount * 0.6969)
+    reimbursement = np.where(miles_traveled > 186.1, reimbursement * 0.9043, reimbursement)
+    reimbursement = np.where(total_receipts_amount > 1770.4, reimbursement * 0.7614, reimbursement)
+    
+    positive = total_receipts_amount > 0
+    miles_receipts_ratio = np.divide(miles_traveled, total_receipts_amount,
+                                     out=np.zeros_like(reimbursement), where=positive)
+    reimbursement = np.where(miles_receipts_ratio > 1.3621, reimbursement * 0.8000, reimbursement)
+    return reimbursement
+
+def calculate_2_day_trip_batch(miles_traveled, total_receipts_amount):
+    """Vectorized calculate_2_day_trip before rounding"""
+    reimbursement = 67.10 + (miles_traveled * 0.8181) + (total_receipts_amount * 0.6038)
+    reimbursement = np.where(miles_traveled < 120.2, reimbursement * 1.0948, reimbursement)
+    reimbursement = np.where(miles_traveled > 375.4, reimbursement * 0.7971, reimbursement)
+    return reimbursement
+
+def calculate_3_day_trip_batch(miles_traveled, total_receipts_amount):
+    """Vectorized calculate_3_day_trip before rounding"""
+    reimbursement = 146.35 + (miles_traveled * 0.3748) + (total_receipts_amount * 0.8115)
+    reimbursement = np.where(total_receipts_amount < 257.6, reimbursement * 1.3000, reimbursement)
+    reimbursement = np.where(miles_traveled > 1054.9, reimbursement * 0.8087, reimbursement)
+    reimbursement = np.where(total_receipts_amount > 1756.9, reimbursement * 0.7014, reimbursement)
+    return reimbursement
+
+def calculate_4_6_day_trip_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """Vectorized calculate_4_6_day_trip before rounding"""
+    reimbursement = (trip_duration_days * 69.452) + (miles_traveled * 0.4786) + (total_receipts_amount * 0.5925)
+    reimbursement = np.where(miles_traveled < 786.4, reimbursement * 1.0893, reimbursement)
+    reimbursement = np.where(miles_traveled > 1364.6, reimbursement * 0.5967, reimbursement)
+    reimbursement = np.where(total_receipts_amount > 1988.5, reimbursement * 0.8019, reimbursement)
+    return reimbursement
+
+def calculate_7_plus_day_trip_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """Vectorized calculate_7_plus_day_trip before rounding"""
+    daily_rate = 38.070
+    mile_rate = np.full(miles_traveled.shape, 0.5547)
+    receipt_rate = np.full(miles_traveled.shape, 0.8547)
+    bonus = np.full(miles_traveled.shape, 28.267)
+    
+    positive = total_receipts_amount > 0
+    miles_receipts_ratio = np.divide(miles_traveled, total_receipts_amount,
+                                     out=np.zeros_like(mile_rate), where=positive)
+    hustle = miles_receipts_ratio > 0.7006
+    mile_rate = np.where(hustle, mile_rate * 1.2000, mile_rate)
+    bonus = np.where(hustle, bonus + 8.144, bonus)
+    
+    high_spending = (total_receipts_amount / trip_duration_days) > 165.7
+    receipt_rate = np.where(high_spending, receipt_rate * 0.9014, receipt_rate)
+    receipt_rate = np.where(high_spending & (trip_duration_days >= 8), receipt_rate * 0.9099, receipt_rate)
+    
+    mile_rate = np.where(miles_traveled > 897.8, mile_rate * 1.0000, mile_rate)
+    receipt_rate = np.where(total_receipts_amount > 1888.2, receipt_rate * 0.6597, receipt_rate)
+    
+    reimbursement = (trip_duration_days * daily_rate) + (miles_traveled * mile_rate) + (total_receipts_amount * receipt_rate) + bonus
+    
+    cap = np.where(trip_duration_days >= 10, 2000.0,
+                   np.where(trip_duration_days >= 7, 1586.825 + (trip_duration_days * 32.398), 1505.544))
+    return np.where(reimbursement > cap, cap, reimbursement)
+
+if __name__ == "__main__":
+    import sys
+    from stream_io import parse_case, run_stream
+
+    if len(sys.argv) == 4:
+        print(calculate_reimbursement(*parse_case(*sys.argv[1:])))
+    elif sys.argv[1:] == ['--stream']:
+        # Batch mode: 'days miles receipts' (or JSON) lines on stdin, one result per line on stdout
+        run_stream(lambda cases: [str(calculate_reimbursement(*case)) for case in cases])
+    else:
+        print("Usage: reimbursement.py <trip_duration_days> <miles_traveled> <total_receipts_amount>")
+        print("       reimbursement.py --stream < cases.txt")
+        sys.exit(1)
@@ -8,13 +8,21 @@ RECEIPTS=$3
 # Create lookup key
 KEY="${DAYS}_${MILES}_${RECEIPTS}"
 
-# Use jq to lookup the prediction from the JSON file
-PREDICTION=$(jq -r ".[\"$KEY\"]" xgboost_predictions.json)
+# Use jq to lookup the prediction from the JSON file. If generate_xgboost_predictions.py recorded
+# which model made it, only use it while that is still the current model; files without the
+# xgboost_predictions.meta.json sidecar are legacy and always used.
+if [ -f xgboost_predictions.meta.json ]; then
+    PREDICTION=$(jq -r -n --arg key "$KEY" \
+        'input.model_sha256 as $made_by | if $made_by == input.sha256 then input[$key] else null end' \
+        xgboost_predictions.meta.json xgboost_model.meta.json xgboost_predictions.json 2>/dev/null)
+else
+    PREDICTION=$(jq -r ".[\"$KEY\"]" xgboost_predictions.json)
+fi
 
-# If prediction is null, fall back to XGBoost model
-if [ "$PREDICTION" = "null" ]; then
+# If prediction is null or stale, fall back to XGBoost model (served warm by prediction_daemon.py)
+if [ -z "$PREDICTION" ] || [ "$PREDICTION" = "null" ]; then
     source ~/Documents/dev/envs/dev/bin/activate
-    python xgboost_solution.py "$DAYS" "$MILES" "$RECEIPTS"
+    python predict_client.py "$DAYS" "$MILES" "$RECEIPTS"
 else
     echo "$PREDICTION"
 fi 
\ No newline at end of file
@@ -1,3 +1,3 @@
 #!/bin/bash
 source ~/Documents/dev/envs/dev/bin/activate
-python xgboost_solution.py "$1" "$2" "$3" 
\ No newline at end of file
+python predict_client.py "$1" "$2" "$3" 
\ No newline at end of file
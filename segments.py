@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Trip-duration segments of a case file: the columns are sorted by duration once, so any
+# duration or duration range is a contiguous zero-copy slice, and seeded stratified samples
+# replace the random per-duration files create_subset.py used to be the only source of.
+
+import sys
+import numpy as np
+from cases import load_columns
+
+# Duration ranges (first, last) used by the analyses; None means no upper bound
+SEGMENTS = {
+    '1': (1, 1),
+    '2': (2, 2),
+    '3': (3, 3),
+    '4-6': (4, 6),
+    '7+': (7, None),
+    '10+': (10, None)
+}
+
+DEFAULT_SAMPLES_PER_DURATION = 10
+DEFAULT_SEED = 42
+
+def build_segment_index(columns):
+    """Sort columns by trip duration and record where each duration starts.
+
+    offsets[d] is the first sorted row with a duration of at least d; the sort is
+    stable, so cases of one duration keep their order in the source file.
+    """
+    order = np.argsort(columns['days'], kind='stable')
+    sorted_columns = {name: None if values is None else np.asarray(values)[order] for name, values in columns.items()}
+    days = sorted_columns['days']
+    max_days = int(days[-1]) if len(days) else 0
+    return {
+        'columns': sorted_columns,
+        'offsets': np.searchsorted(days, np.arange(max_days + 2)),
+        'order': order
+    }
+
+def load_segment_index(filename='public_cases.json'):
+    """Segment index over a whole case file"""
+    return build_segment_index(load_columns(filename))
+
+def duration_slice(index, first, last=None):
+    """Slice of the sorted rows with first <= duration <= last (no upper bound if last is None)"""
+    offsets = index['offsets']
+    size = len(index['columns']['days'])
+    start = offsets[first] if first < len(offsets) else size
+    stop = offsets[last + 1] if last is not None and last + 1 < len(offsets) else size
+    return slice(int(start), int(max(start, stop)))
+
+def segment(index, first, last=None):
+    """Columns of the cases with a duration in [first, last], as views into the index"""
+    rows = duration_slice(index, first, last)
+    return {name: None if values is None else values[rows] for name, values in index['columns'].items()}
+
+def named_segment(index, name):
+    """Columns of one of the SEGMENTS, e.g. named_segment(index, '4-6')"""
+    return segment(index, *SEGMENTS[name])
+
+def durations(index):
+    """Trip durations present in the index, ascending"""
+    return np.flatnonzero(np.diff(index['offsets'])).tolist()
+
+def stratified_sample(index, samples_per_duration=DEFAULT_SAMPLES_PER_DURATION, seed=DEFAULT_SEED, first=1, last=None):
+    """Up to samples_per_duration cases of each duration in [first, last], drawn reproducibly from seed.
+
+    Each duration is drawn from its own generator seeded with (seed, duration), so its sample
+    does not depend on which other durations are requested: analyzing 4-6 day trips picks the
+    same cases as create_subset.py does for those durations. Each sample is a prefix of the
+    duration's permutation, so a smaller sample is contained in any larger one with the same
+    seed. Durations with fewer cases are taken whole; the sample stays sorted by duration.
+    """
+    rows = []
+    for duration in durations(index):
+        if duration < first or (last is not None and duration > last):
+            continue
+        group = duration_slice(index, duration, duration)
+        count = group.stop - group.start
+        rng = np.random.default_rng([seed, duration])
+        chosen = rng.permutation(count)[:samples_per_duration]
+        rows.append(group.start + np.sort(chosen))
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    return {name: None if values is None else values[rows] for name, values in index['columns'].items()}
+
+def main():
+    # Summarize a case file's segments: python3 segments.py [case_file]
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'public_cases.json'
+    index = load_segment_index(filename)
+    print(f"📊 {filename}: {len(index['columns']['days'])} cases")
+    for name in SEGMENTS:
+        columns = named_segment(index, name)
+        line = f"  {name + ' days':<10} {len(columns['days']):5} cases"
+        if columns['expected'] is not None and len(columns['expected']):
+            line += f", avg expected ${columns['expected'].mean():.2f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import json
+import sys
+from itertools import islice
+
+# Lines scored per batch in --stream mode; bounds memory regardless of input size
+DEFAULT_CHUNK_SIZE = 1024
+
+def parse_case(days, miles, receipts):
+    """Parse command line style inputs (miles may be fractional in private_cases.json)"""
+    miles = float(miles)
+    if miles.is_integer():
+        miles = int(miles)
+    return int(days), miles, float(receipts)
+
+def parse_line(line):
+    """Parse a 'days miles receipts' line or a JSON object (private or public case format)"""
+    line = line.strip()
+    if line.startswith('{'):
+        case = json.loads(line)
+        case = case.get('input', case)
+        return case['trip_duration_days'], case['miles_traveled'], case['total_receipts_amount']
+    return parse_case(*line.split())
+
+def iter_chunks(lines, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of parsed cases, at most chunk_size at a time, skipping blank lines"""
+    cases = (parse_line(line) for line in lines if line.strip())
+    while True:
+        chunk = list(islice(cases, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def run_stream(predict_chunk, input_stream=None, output_stream=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score newline-delimited cases from stdin, writing one prediction per line to stdout.
+
+    predict_chunk takes a list of (days, miles, receipts) tuples and returns the
+    formatted predictions in the same order.
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    for chunk in iter_chunks(input_stream, chunk_size):
+        output_stream.write('\n'.join(predict_chunk(chunk)) + '\n')
+        output_stream.flush()
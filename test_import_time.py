@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cold `import xgboost_solution` must stay under this many seconds
+IMPORT_BUDGET_SECONDS = 0.5
+
+# Training-only dependencies that prediction mode must not import at module load
+FORBIDDEN_MODULES = ('pandas', 'sklearn', 'xgboost', 'scipy')
+
+def import_times(module):
+    """Run `python -X importtime -c 'import module'` and parse it into (name, depth, cumulative_us) rows"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nested imports are indented by two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative_us)))
+    return rows
+
+def test_import_time(module='xgboost_solution', budget=IMPORT_BUDGET_SECONDS):
+    rows = import_times(module)
+    index = next(i for i, (name, depth, _) in enumerate(rows) if name == module and depth == 0)
+    total = rows[index][2] / 1e6
+
+    # importtime lists a module's imports just before the module itself
+    start = index
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    direct = [row for row in rows[start:index] if row[1] == 1]
+
+    print(f"Import breakdown for {module} (slowest direct imports):")
+    for name, _, cumulative in sorted(direct, key=lambda row: row[2], reverse=True)[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print(f"Total: {total * 1000:.1f} ms (budget {budget * 1000:.0f} ms)")
+
+    imported = {name.split('.')[0] for name, _, _ in rows[start:index + 1]}
+    forbidden = sorted(imported.intersection(FORBIDDEN_MODULES))
+    assert not forbidden, f"{module} imports training-only modules at load time: {', '.join(forbidden)}"
+    assert total <= budget, f"{module} import took {total:.3f}s, over the {budget:.3f}s budget"
+
+if __name__ == "__main__":
+    try:
+        test_import_time()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print("✅ Import time within budget")
@@ -1,45 +1,31 @@
 #!/usr/bin/env python3
 
-import json
-from reimbursement import calculate_reimbursement
+import numpy as np
+from cases import as_inputs, load_columns, miles as miles_column, receipts as receipts_column
+from reimbursement import calculate_reimbursement_batch
 
 def load_data():
-    """Load the public cases data"""
-    with open('public_cases.json', 'r') as f:
-        data = json.load(f)
-    
-    cases = []
-    for case in data:
-        cases.append({
-            'days': case['input']['trip_duration_days'],
-            'miles': case['input']['miles_traveled'],
-            'receipts': case['input']['total_receipts_amount'],
-            'expected': case['expected_output']
-        })
-    return cases
+    """Load the public cases data as typed columns (see cases.py)"""
+    return load_columns('public_cases.json')
 
 def test_accuracy():
     """Test the accuracy of our current implementation"""
-    cases = load_data()
-    
-    total_error = 0
-    exact_matches = 0
-    close_matches = 0
-    worst_cases = []
-    
-    for i, case in enumerate(cases):
-        predicted = calculate_reimbursement(case['days'], case['miles'], case['receipts'])
-        error = abs(predicted - case['expected'])
-        total_error += error
-        
-        if error < 0.01:
-            exact_matches += 1
-        elif error < 1.0:
-            close_matches += 1
-            
-        # Track worst cases
-        worst_cases.append((i+1, case['days'], case['miles'], case['receipts'], 
-                           case['expected'], predicted, error))
+    columns = load_data()
+    cases = as_inputs(columns)
+    expected_outputs = columns['expected']
+    
+    # calculate_reimbursement_batch is bit-identical to calculate_reimbursement per case
+    predicted_outputs = calculate_reimbursement_batch(columns['days'], miles_column(columns), receipts_column(columns))
+    errors = np.abs(predicted_outputs - expected_outputs)
+    
+    total_error = sum(errors.tolist())
+    exact_matches = int(np.count_nonzero(errors < 0.01))
+    close_matches = int(np.count_nonzero((errors >= 0.01) & (errors < 1.0)))
+    worst_cases = [
+        (i+1, case['trip_duration_days'], case['miles_traveled'], case['total_receipts_amount'], expected, predicted, error)
+        for i, (case, expected, predicted, error) in enumerate(zip(cases, expected_outputs.tolist(),
+                                                                   predicted_outputs.tolist(), errors.tolist()))
+    ]
     
     # Sort by error (descending)
     worst_cases.sort(key=lambda x: x[6], reverse=True)
@@ -1,24 +1,15 @@
-import json
+import argparse
 import numpy as np
+from cases import as_inputs, load_columns, miles, receipts
 from scipy.optimize import minimize
+from scipy.special import expit
 from typing import List, Dict, Tuple
 
-def load_training_data(filename: str) -> Tuple[List[Dict], List[float]]:
-    with open(filename, 'r') as f:
-        data = json.load(f)
-    
-    X = []  # Input features
-    y = []  # Expected outputs
-    
-    for case in data:
-        X.append({
-            'trip_duration_days': case['input']['trip_duration_days'],
-            'miles_traveled': case['input']['miles_traveled'],
-            'total_receipts_amount': case['input']['total_receipts_amount']
-        })
-        y.append(case['expected_output'])
-    
-    return X, y
+def load_training_data(filename: str) -> Tuple[Dict[str, np.ndarray], List[Dict], List[float]]:
+    columns = load_columns(filename)  # Typed columns, used directly by the surrogate
+    X = as_inputs(columns)  # Input features
+    y = columns['expected'].tolist()  # Expected outputs
+    return columns, X, y
 
 def calculate_reimbursement(params: np.ndarray, case: Dict) -> float:
     # Unpack parameters
@@ -151,116 +142,153 @@ def loss_function(params: np.ndarray, cases: List[Dict], targets: List[float]) -
         total_loss += error
     return total_loss / len(cases)
 
-def main():
-    # Load training data
-    print("Loading training data...")
-    X_train, y_train = load_training_data('public_cases.json')
-    
-    # Initial parameter guesses
-    initial_params = np.array([
-        90.0,   # base_per_diem_short
-        80.0,   # base_per_diem_medium
-        70.0,   # base_per_diem_long
-        0.05,   # five_day_bonus
-        
-        0.55,   # mileage_rate_1
-        0.45,   # mileage_rate_2
-        0.35,   # mileage_rate_3
-        0.25,   # mileage_rate_4
-        
-        0.7,    # receipt_rate_1
-        0.6,    # receipt_rate_2
-        0.4,    # receipt_rate_3
-        0.2,    # receipt_rate_4
-        
-        0.1,    # efficiency_bonus_short
-        0.05,   # efficiency_bonus_long
-        
-        0.02,   # duration_factor
-        
-        0.2,    # high_mileage_penalty
-        0.2,    # high_receipt_penalty
-        
-        1000.0, # cap_base
-        100.0,  # cap_per_day
-        0.2     # cap_reduction
-    ])
-    
-    # Parameter bounds
-    bounds = [
-        (50.0, 150.0),  # base_per_diem_short
-        (50.0, 150.0),  # base_per_diem_medium
-        (50.0, 150.0),  # base_per_diem_long
-        (0.0, 0.2),     # five_day_bonus
-        
-        (0.3, 0.8),     # mileage_rate_1
-        (0.2, 0.7),     # mileage_rate_2
-        (0.1, 0.6),     # mileage_rate_3
-        (0.1, 0.5),     # mileage_rate_4
-        
-        (0.4, 1.0),     # receipt_rate_1
-        (0.3, 0.9),     # receipt_rate_2
-        (0.2, 0.8),     # receipt_rate_3
-        (0.1, 0.7),     # receipt_rate_4
-        
-        (0.0, 0.3),     # efficiency_bonus_short
-        (0.0, 0.2),     # efficiency_bonus_long
-        
-        (0.0, 0.1),     # duration_factor
-        
-        (0.0, 0.5),     # high_mileage_penalty
-        (0.0, 0.5),     # high_receipt_penalty
-        
-        (500.0, 2000.0),  # cap_base
-        (50.0, 200.0),    # cap_per_day
-        (0.0, 0.5)        # cap_reduction
-    ]
-    
-    print("Starting optimization...")
-    result = minimize(
-        loss_function,
-        initial_params,
-        args=(X_train, y_train),
-        method='L-BFGS-B',
-        bounds=bounds,
-        options={'maxiter': 1000}
-    )
-    
-    print("\nOptimization complete!")
-    print(f"Final average error: ${result.fun:.2f}")
-    
-    # Generate the optimized reimbursement.py
-    optimized_params = result.x
-    with open('reimbursement.py', 'w') as f:
-        f.write(f"""def calculate_reimbursement(trip_duration_days: int, miles_traveled: int, total_receipts_amount: float) -> float:
-    # Optimized parameters
-    BASE_PER_DIEM_SHORT = {optimized_params[0]:.4f}
-    BASE_PER_DIEM_MEDIUM = {optimized_params[1]:.4f}
-    BASE_PER_DIEM_LONG = {optimized_params[2]:.4f}
-    FIVE_DAY_BONUS = {optimized_params[3]:.4f}
-    
-    MILEAGE_RATE_1 = {optimized_params[4]:.4f}
-    MILEAGE_RATE_2 = {optimized_params[5]:.4f}
-    MILEAGE_RATE_3 = {optimized_params[6]:.4f}
-    MILEAGE_RATE_4 = {optimized_params[7]:.4f}
-    
-    RECEIPT_RATE_1 = {optimized_params[8]:.4f}
-    RECEIPT_RATE_2 = {optimized_params[9]:.4f}
-    RECEIPT_RATE_3 = {optimized_params[10]:.4f}
-    RECEIPT_RATE_4 = {optimized_params[11]:.4f}
-    
-    EFFICIENCY_BONUS_SHORT = {optimized_params[12]:.4f}
-    EFFICIENCY_BONUS_LONG = {optimized_params[13]:.4f}
-    
-    DURATION_FACTOR = {optimized_params[14]:.4f}
-    
-    HIGH_MILEAGE_PENALTY = {optimized_params[15]:.4f}
-    HIGH_RECEIPT_PENALTY = {optimized_params[16]:.4f}
-    
-    CAP_BASE = {optimized_params[17]:.4f}
-    CAP_PER_DAY = {optimized_params[18]:.4f}
-    CAP_REDUCTION = {optimized_params[19]:.4f}
-    
+# Smoothed surrogate of loss_function for gradient-based training.
+# Every threshold in calculate_reimbursement compares inputs against fixed constants, so the
+# tier amounts and condition masks are exact per-case constants. Only the cap (min), round()
+# and abs() depend non-smoothly on the parameters: min becomes a softmin and abs a smooth
+# absolute value, both with a temperature (in dollars) that is annealed towards the hard model.
+SURROGATE_TEMPERATURES = (100.0, 30.0, 10.0, 3.0, 1.0, 0.3)
+
+def tiers(values: np.ndarray, widths: List[float]) -> np.ndarray:
+    # Amount falling in each tier (the last tier is unbounded), as an (n, len(widths) + 1) array
+    edges = np.concatenate(([0.0], np.cumsum(widths)))
+    columns = [np.clip(values - lower, 0.0, width) for lower, width in zip(edges[:-1], widths)]
+    columns.append(np.maximum(values - edges[-1], 0.0))
+    return np.stack(columns, axis=1)
+
+def extract_features(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    # Per-case constants of the surrogate, straight from the cases.py columns
+    days = columns['days'].astype(np.float64)
+    miles_traveled = miles(columns)
+    receipts_amount = receipts(columns)
+    miles_per_day = miles_traveled / days
+    
+    return {
+        'days': days,
+        'per_diem_groups': np.stack([days <= 3, (days > 3) & (days <= 7), days > 7], axis=1) * days[:, None],
+        'five_day': (days == 5).astype(np.float64),
+        'mileage_tiers': tiers(miles_traveled, [100, 200, 300]),
+        'efficiency_short': ((days <= 3) & (miles_per_day > 200)).astype(np.float64),
+        'efficiency_long': ((days > 3) & (miles_per_day > 150)).astype(np.float64),
+        'receipt_tiers': tiers(receipts_amount, [100, 400, 500]),
+        'duration_days': np.where(days > 3, days, 0.0),
+        'high_mileage': (miles_traveled > 800).astype(np.float64),
+        'high_receipts': (receipts_amount > 1500).astype(np.float64),
+        'cap_reduced': ((miles_traveled > 800) | (receipts_amount > 1500)).astype(np.float64),
+    }
+
+def surrogate_loss(params: np.ndarray, features: Dict[str, np.ndarray], targets: np.ndarray,
+                   temperature: float) -> Tuple[float, np.ndarray]:
+    # Smoothed average error and its exact gradient with respect to params
+    f = features
+    per_diem_base = f['per_diem_groups'] @ params[0:3]
+    five_day = 1.0 + f['five_day'] * params[3]
+    per_diem = per_diem_base * five_day
+    
+    mileage_base = f['mileage_tiers'] @ params[4:8]
+    efficiency = 1.0 + f['efficiency_short'] * params[12] + f['efficiency_long'] * params[13]
+    mileage_penalty = 1.0 - f['high_mileage'] * params[15]
+    mileage = mileage_base * efficiency * mileage_penalty
+    
+    receipt_base = f['receipt_tiers'] @ params[8:12]
+    duration = 1.0 + f['duration_days'] * params[14]
+    receipt_penalty = 1.0 - f['high_receipts'] * params[16]
+    receipt = receipt_base * duration * receipt_penalty
+    
+    total = per_diem + mileage + receipt
+    cap_base = params[17] + f['days'] * params[18]
+    cap_factor = 1.0 - f['cap_reduced'] * params[19]
+    cap = cap_base * cap_factor
+    
+    # Softmin of total and cap; weight is d(prediction)/d(total)
+    predicted = -temperature * np.logaddexp(-total / temperature, -cap / temperature)
+    weight = expit((cap - total) / temperature)
+    
+    # Smooth absolute error
+    residual = predicted - targets
+    smooth_abs = np.sqrt(residual ** 2 + temperature ** 2)
+    loss = np.mean(smooth_abs - temperature)
+    
+    d_predicted = residual / smooth_abs / len(targets)
+    d_total = d_predicted * weight
+    d_cap = d_predicted * (1.0 - weight)
+    
+    gradient = np.empty_like(params)
+    gradient[0:3] = (d_total * five_day) @ f['per_diem_groups']
+    gradient[3] = np.sum(d_total * per_diem_base * f['five_day'])
+    gradient[4:8] = (d_total * efficiency * mileage_penalty) @ f['mileage_tiers']
+    gradient[12] = np.sum(d_total * mileage_base * mileage_penalty * f['efficiency_short'])
+    gradient[13] = np.sum(d_total * mileage_base * mileage_penalty * f['efficiency_long'])
+    gradient[15] = -np.sum(d_total * mileage_base * efficiency * f['high_mileage'])
+    gradient[8:12] = (d_total * duration * receipt_penalty) @ f['receipt_tiers']
+    gradient[14] = np.sum(d_total * receipt_base * receipt_penalty * f['duration_days'])
+    gradient[16] = -np.sum(d_total * receipt_base * duration * f['high_receipts'])
+    gradient[17] = np.sum(d_cap * cap_factor)
+    gradient[18] = np.sum(d_cap * f['days'] * cap_factor)
+    gradient[19] = -np.sum(d_cap * cap_base * f['cap_reduced'])
+    
+    return loss, gradient
+
+def train_surrogate(initial_params: np.ndarray, bounds: List[Tuple[float, float]], columns: Dict[str, np.ndarray],
+                    temperatures: Tuple[float, ...] = SURROGATE_TEMPERATURES) -> Tuple[np.ndarray, int]:
+    # L-BFGS-B with exact gradients on the surrogate, annealing the temperature;
+    # returns the parameters and the number of surrogate evaluations
+    features = extract_features(columns)
+    targets = np.asarray(columns['expected'], dtype=np.float64)
+    params = np.asarray(initial_params, dtype=np.float64)
+    evaluations = 0
+    
+    for temperature in temperatures:
+        result = minimize(
+            surrogate_loss,
+            params,
+            args=(features, targets, temperature),
+            jac=True,
+            method='L-BFGS-B',
+            bounds=bounds,
+            options={'maxiter': 1000}
+        )
+        params = result.x
+        evaluations += result.nfev
+        print(f"  temperature ${temperature:g}: surrogate error ${result.fun:.2f} ({result.nfev} evaluations)")
+    
+    return params, evaluations
+
+def write_reimbursement(optimized_params: np.ndarray, path: str = 'reimbursement.py') -> None:
+    # Write reimbursement.py with the same interface as generate_optimized_reimbursement.py:
+    # scalar and batch functions plus the command line / --stream entry point
+    with open(path, 'w') as f:
+        f.write(f'''import numpy as np
+
+# Optimized parameters
+BASE_PER_DIEM_SHORT = {optimized_params[0]:.4f}
+BASE_PER_DIEM_MEDIUM = {optimized_params[1]:.4f}
+BASE_PER_DIEM_LONG = {optimized_params[2]:.4f}
+FIVE_DAY_BONUS = {optimized_params[3]:.4f}
+
+MILEAGE_RATE_1 = {optimized_params[4]:.4f}
+MILEAGE_RATE_2 = {optimized_params[5]:.4f}
+MILEAGE_RATE_3 = {optimized_params[6]:.4f}
+MILEAGE_RATE_4 = {optimized_params[7]:.4f}
+
+RECEIPT_RATE_1 = {optimized_params[8]:.4f}
+RECEIPT_RATE_2 = {optimized_params[9]:.4f}
+RECEIPT_RATE_3 = {optimized_params[10]:.4f}
+RECEIPT_RATE_4 = {optimized_params[11]:.4f}
+
+EFFICIENCY_BONUS_SHORT = {optimized_params[12]:.4f}
+EFFICIENCY_BONUS_LONG = {optimized_params[13]:.4f}
+
+DURATION_FACTOR = {optimized_params[14]:.4f}
+
+HIGH_MILEAGE_PENALTY = {optimized_params[15]:.4f}
+HIGH_RECEIPT_PENALTY = {optimized_params[16]:.4f}
+
+CAP_BASE = {optimized_params[17]:.4f}
+CAP_PER_DAY = {optimized_params[18]:.4f}
+CAP_REDUCTION = {optimized_params[19]:.4f}
+
+def calculate_reimbursement(trip_duration_days: int, miles_traveled: int, total_receipts_amount: float) -> float:
     # Calculate per diem
     if trip_duration_days <= 3:
         base_per_diem = BASE_PER_DIEM_SHORT
@@ -348,7 +376,193 @@ def main():
     
     # Round to 2 decimal places
     return round(total, 2)
-""")
+
+def round_like_python(values):
+    """
+    Vectorized round(x, 2) with Python's exact semantics.
+    np.round scales by 100 in binary floating point, which can land on the other side
+    of a .5 boundary; those few near-tie values are rounded with the builtin instead.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, 2) for value in values[near_tie].tolist()]
+    return rounded
+
+def tier_batch(remaining, width):
+    """Amount of each value in the next tier of the given width, and what is left above it"""
+    tier = np.minimum(remaining, width)
+    return tier, remaining - tier
+
+def calculate_reimbursement_batch(trip_duration_days, miles_traveled, total_receipts_amount):
+    """
+    Vectorized calculate_reimbursement over NumPy arrays.
+    Every step applies the same operations in the same order as the scalar code,
+    so results are bit-identical to calling calculate_reimbursement per case.
+    """
+    days = np.asarray(trip_duration_days, dtype=np.float64)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+    
+    # Per diem and 5-day bonus
+    base_per_diem = np.where(days <= 3, BASE_PER_DIEM_SHORT,
+                             np.where(days <= 7, BASE_PER_DIEM_MEDIUM, BASE_PER_DIEM_LONG))
+    per_diem = base_per_diem * days
+    per_diem = np.where(days == 5, per_diem * (1.0 + FIVE_DAY_BONUS), per_diem)
+    
+    # Tiered mileage (an empty tier adds exactly 0.0, as the scalar code skips it)
+    miles_tier_1, miles_remaining = tier_batch(miles, 100)
+    miles_tier_2, miles_remaining = tier_batch(miles_remaining, 200)
+    miles_tier_3, miles_remaining = tier_batch(miles_remaining, 300)
+    mileage_reimbursement = miles_tier_1 * MILEAGE_RATE_1
+    mileage_reimbursement = mileage_reimbursement + miles_tier_2 * MILEAGE_RATE_2
+    mileage_reimbursement = mileage_reimbursement + miles_tier_3 * MILEAGE_RATE_3
+    mileage_reimbursement = mileage_reimbursement + miles_remaining * MILEAGE_RATE_4
+    
+    # Efficiency bonus
+    miles_per_day = miles / days
+    short = (days <= 3) & (miles_per_day > 200)
+    long = (days > 3) & (miles_per_day > 150)
+    mileage_reimbursement = np.where(short, mileage_reimbursement * (1.0 + EFFICIENCY_BONUS_SHORT),
+                                     np.where(long, mileage_reimbursement * (1.0 + EFFICIENCY_BONUS_LONG),
+                                              mileage_reimbursement))
+    
+    # Tiered receipts
+    receipts_tier_1, receipts_remaining = tier_batch(receipts, 100)
+    receipts_tier_2, receipts_remaining = tier_batch(receipts_remaining, 400)
+    receipts_tier_3, receipts_remaining = tier_batch(receipts_remaining, 500)
+    receipt_reimbursement = receipts_tier_1 * RECEIPT_RATE_1
+    receipt_reimbursement = receipt_reimbursement + receipts_tier_2 * RECEIPT_RATE_2
+    receipt_reimbursement = receipt_reimbursement + receipts_tier_3 * RECEIPT_RATE_3
+    receipt_reimbursement = receipt_reimbursement + receipts_remaining * RECEIPT_RATE_4
+    
+    # Duration factor for receipts
+    receipt_reimbursement = np.where(days > 3, receipt_reimbursement * (1.0 + (days * DURATION_FACTOR)),
+                                     receipt_reimbursement)
+    
+    # Penalties for high values
+    mileage_reimbursement = np.where(miles > 800, mileage_reimbursement * (1.0 - HIGH_MILEAGE_PENALTY),
+                                     mileage_reimbursement)
+    receipt_reimbursement = np.where(receipts > 1500, receipt_reimbursement * (1.0 - HIGH_RECEIPT_PENALTY),
+                                     receipt_reimbursement)
+    
+    # Total and caps
+    total = per_diem + mileage_reimbursement + receipt_reimbursement
+    max_reimbursement = CAP_BASE + (days * CAP_PER_DAY)
+    max_reimbursement = np.where((miles > 800) | (receipts > 1500), max_reimbursement * (1.0 - CAP_REDUCTION),
+                                 max_reimbursement)
+    total = np.minimum(total, max_reimbursement)
+    
+    return round_like_python(total)
+
+if __name__ == "__main__":
+    import sys
+    from stream_io import parse_case, run_stream
+
+    if len(sys.argv) == 4:
+        print(calculate_reimbursement(*parse_case(*sys.argv[1:])))
+    elif sys.argv[1:] == ['--stream']:
+        # Batch mode: 'days miles receipts' (or JSON) lines on stdin, one result per line on stdout
+        run_stream(lambda cases: [str(calculate_reimbursement(*case)) for case in cases])
+    else:
+        print("Usage: reimbursement.py <trip_duration_days> <miles_traveled> <total_receipts_amount>")
+        print("       reimbursement.py --stream < cases.txt")
+        sys.exit(1)
+''')
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the tiered reimbursement model and write reimbursement.py")
+    parser.add_argument('--surrogate', action='store_true',
+                        help="Train on a smoothed surrogate loss with exact gradients, then score the hard model")
+    args = parser.parse_args()
+    
+    # Load training data
+    print("Loading training data...")
+    columns, X_train, y_train = load_training_data('public_cases.json')
+    
+    # Initial parameter guesses
+    initial_params = np.array([
+        90.0,   # base_per_diem_short
+        80.0,   # base_per_diem_medium
+        70.0,   # base_per_diem_long
+        0.05,   # five_day_bonus
+        
+        0.55,   # mileage_rate_1
+        0.45,   # mileage_rate_2
+        0.35,   # mileage_rate_3
+        0.25,   # mileage_rate_4
+        
+        0.7,    # receipt_rate_1
+        0.6,    # receipt_rate_2
+        0.4,    # receipt_rate_3
+        0.2,    # receipt_rate_4
+        
+        0.1,    # efficiency_bonus_short
+        0.05,   # efficiency_bonus_long
+        
+        0.02,   # duration_factor
+        
+        0.2,    # high_mileage_penalty
+        0.2,    # high_receipt_penalty
+        
+        1000.0, # cap_base
+        100.0,  # cap_per_day
+        0.2     # cap_reduction
+    ])
+    
+    # Parameter bounds
+    bounds = [
+        (50.0, 150.0),  # base_per_diem_short
+        (50.0, 150.0),  # base_per_diem_medium
+        (50.0, 150.0),  # base_per_diem_long
+        (0.0, 0.2),     # five_day_bonus
+        
+        (0.3, 0.8),     # mileage_rate_1
+        (0.2, 0.7),     # mileage_rate_2
+        (0.1, 0.6),     # mileage_rate_3
+        (0.1, 0.5),     # mileage_rate_4
+        
+        (0.4, 1.0),     # receipt_rate_1
+        (0.3, 0.9),     # receipt_rate_2
+        (0.2, 0.8),     # receipt_rate_3
+        (0.1, 0.7),     # receipt_rate_4
+        
+        (0.0, 0.3),     # efficiency_bonus_short
+        (0.0, 0.2),     # efficiency_bonus_long
+        
+        (0.0, 0.1),     # duration_factor
+        
+        (0.0, 0.5),     # high_mileage_penalty
+        (0.0, 0.5),     # high_receipt_penalty
+        
+        (500.0, 2000.0),  # cap_base
+        (50.0, 200.0),    # cap_per_day
+        (0.0, 0.5)        # cap_reduction
+    ]
+    
+    print("Starting optimization...")
+    if args.surrogate:
+        optimized_params, evaluations = train_surrogate(initial_params, bounds, columns)
+        # Snap back to the hard model (thresholds, min and rounding) for the final score
+        final_error = loss_function(optimized_params, X_train, y_train)
+    else:
+        result = minimize(
+            loss_function,
+            initial_params,
+            args=(X_train, y_train),
+            method='L-BFGS-B',
+            bounds=bounds,
+            options={'maxiter': 1000}
+        )
+        optimized_params, final_error, evaluations = result.x, result.fun, result.nfev
+    
+    print("\nOptimization complete!")
+    print(f"Final average error: ${final_error:.2f} ({evaluations} loss evaluations)")
+    
+    # Generate the optimized reimbursement.py
+    write_reimbursement(optimized_params)
     
     print("\nGenerated optimized reimbursement.py")
     print("Run eval.sh to test the optimized implementation")
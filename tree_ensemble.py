@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+# Compiled XGBoost tree ensembles: every tree flattened into one NumPy node table,
+# so serving needs only NumPy instead of the xgboost runtime.
+
+import json
+import os
+import sys
+import numpy as np
+
+# Rows of the (6, n_nodes) int32 node table. Thresholds and leaf values are float32
+# stored as their bit patterns, so the whole table is one memory-mappable .npy file.
+# Leaves point to themselves, which lets every tree be walked for the same number of levels.
+FEATURE, THRESHOLD, LEFT, RIGHT, MISSING, VALUE = range(6)
+
+# Rows evaluated at once by predict_batch; small chunks keep the (rows x trees) index arrays in cache
+ROWS_PER_CHUNK = 256
+
+# Objectives whose prediction is the raw sum of leaf values plus base_score
+IDENTITY_OBJECTIVES = ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror', 'reg:quantileerror')
+
+def trees_path(model_path):
+    """Node table file for a model file"""
+    return os.path.splitext(model_path)[0] + '.trees.npy'
+
+def trees_metadata_path(model_path):
+    """Tree roots, depth, base score and feature names for a compiled model"""
+    return os.path.splitext(model_path)[0] + '.trees.json'
+
+def flatten_booster(booster):
+    """Flatten a booster's trees into (node table, roots, base_score, depth)"""
+    learner = json.loads(booster.save_raw('json'))['learner']
+    objective = learner['objective']['name']
+    if objective not in IDENTITY_OBJECTIVES:
+        raise ValueError(f"Cannot compile a model with objective {objective}")
+    gradient_booster = learner['gradient_booster']
+    if gradient_booster['name'] != 'gbtree' or set(gradient_booster['model']['tree_info']) - {0}:
+        raise ValueError("Only single-output gbtree models can be compiled")
+
+    trees = gradient_booster['model']['trees']
+    nodes = np.zeros((6, sum(len(tree['left_children']) for tree in trees)), dtype=np.int32)
+    roots = []
+    depth = 0
+    offset = 0
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError("Categorical splits are not supported")
+        left = np.array(tree['left_children'], dtype=np.int32)
+        right = np.array(tree['right_children'], dtype=np.int32)
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        default_left = np.array(tree['default_left'], dtype=bool)
+        leaf = left == -1
+        ids = offset + np.arange(len(left), dtype=np.int32)
+
+        nodes[FEATURE, ids] = np.where(leaf, 0, tree['split_indices'])
+        nodes[THRESHOLD, ids] = np.where(leaf, 0.0, conditions).astype(np.float32).view(np.int32)
+        nodes[LEFT, ids] = np.where(leaf, ids, offset + left)
+        nodes[RIGHT, ids] = np.where(leaf, ids, offset + right)
+        nodes[MISSING, ids] = np.where(default_left, nodes[LEFT, ids], nodes[RIGHT, ids])
+        # A leaf's split condition holds its (learning-rate scaled) value
+        nodes[VALUE, ids] = np.where(leaf, conditions, 0.0).astype(np.float32).view(np.int32)
+
+        # Parents come before their children, so one pass gives every node's depth
+        node_depth = np.zeros(len(left), dtype=np.int32)
+        for node, parent in enumerate(tree['parents']):
+            if node > 0:
+                node_depth[node] = node_depth[parent] + 1
+        depth = max(depth, int(node_depth.max()))
+
+        roots.append(offset)
+        offset += len(left)
+
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    return nodes, roots, base_score, depth
+
+def export_booster(booster, model_path, feature_names, source_sha256=None):
+    """Write the compiled trees next to model_path; source_sha256 ties them to the model file"""
+    nodes, roots, base_score, depth = flatten_booster(booster)
+    np.save(trees_path(model_path), nodes)
+    metadata = {
+        'roots': roots,
+        'base_score': base_score,
+        'depth': depth,
+        'feature_names': list(feature_names),
+        'source_sha256': source_sha256
+    }
+    with open(trees_metadata_path(model_path), 'w') as f:
+        json.dump(metadata, f)
+
+def load_ensemble(model_path):
+    """Load compiled trees, memory-mapping the node table so processes share its pages"""
+    with open(trees_metadata_path(model_path), 'r') as f:
+        metadata = json.load(f)
+    nodes = np.load(trees_path(model_path), mmap_mode='r')
+    return {
+        'feature': nodes[FEATURE],
+        'threshold': nodes[THRESHOLD].view(np.float32),
+        'left': nodes[LEFT],
+        'right': nodes[RIGHT],
+        'missing': nodes[MISSING],
+        'value': nodes[VALUE].view(np.float32),
+        'roots': np.array(metadata['roots'], dtype=np.int32),
+        'base_score': np.float32(metadata['base_score']),
+        'depth': metadata['depth'],
+        'feature_names': metadata['feature_names'],
+        'source_sha256': metadata['source_sha256']
+    }
+
+def sum_leaves(ensemble, leaf_values):
+    """Add leaf values to base_score one tree at a time in float32, as XGBoost does"""
+    base = np.full(leaf_values.shape[:-1] + (1,), ensemble['base_score'], dtype=np.float32)
+    return np.cumsum(np.concatenate([base, leaf_values], axis=-1), axis=-1, dtype=np.float32)[..., -1]
+
+def predict_batch(ensemble, features, chunk_size=ROWS_PER_CHUNK):
+    """Predict a (rows x features) matrix, walking all trees level by level for a chunk of rows at once"""
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    predictions = np.empty(len(features), dtype=np.float32)
+    for start in range(0, len(features), chunk_size):
+        chunk = features[start:start + chunk_size]
+        # Offsets of each row in the flattened chunk, so one np.take gathers every tree's feature value
+        row_offsets = (np.arange(len(chunk)) * chunk.shape[1])[:, None]
+        flat = chunk.ravel()
+        nodes = np.repeat(ensemble['roots'][None, :], len(chunk), axis=0)
+        for _ in range(ensemble['depth']):
+            values = np.take(flat, row_offsets + np.take(ensemble['feature'], nodes))
+            # XGBoost goes left when value < threshold and takes the default branch for NaN
+            next_nodes = np.where(values < np.take(ensemble['threshold'], nodes),
+                                  np.take(ensemble['left'], nodes), np.take(ensemble['right'], nodes))
+            missing = np.isnan(values)
+            if missing.any():
+                next_nodes = np.where(missing, np.take(ensemble['missing'], nodes), next_nodes)
+            nodes = next_nodes
+        predictions[start:start + len(chunk)] = sum_leaves(ensemble, np.take(ensemble['value'], nodes))
+    return predictions
+
+def predict_row(ensemble, row):
+    """Predict one feature vector, walking every tree at once"""
+    row = np.asarray(row, dtype=np.float32).ravel()
+    nodes = ensemble['roots']
+    for _ in range(ensemble['depth']):
+        values = row[ensemble['feature'][nodes]]
+        next_nodes = np.where(values < ensemble['threshold'][nodes], ensemble['left'][nodes], ensemble['right'][nodes])
+        nodes = np.where(np.isnan(values), ensemble['missing'][nodes], next_nodes)
+    return sum_leaves(ensemble, ensemble['value'][nodes])
+
+def main():
+    # Compile an existing model: python3 tree_ensemble.py [model_path]
+    from xgboost_solution import default_model_path, load_model_data
+    model_path = sys.argv[1] if len(sys.argv) > 1 else default_model_path()
+    model_data = load_model_data(model_path)
+    export_booster(model_data['booster'], model_path, model_data['feature_names'], model_data['sha256'])
+    ensemble = load_ensemble(model_path)
+    print(f"✅ Compiled {len(ensemble['roots'])} trees ({len(ensemble['value'])} nodes, depth {ensemble['depth']}) "
+          f"to {trees_path(model_path)}")
+
+if __name__ == "__main__":
+    main()
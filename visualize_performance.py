@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import json
+from cases import as_public_cases, load_columns
 import matplotlib.pyplot as plt
 import numpy as np
 from reimbursement import calculate_reimbursement
@@ -9,8 +9,7 @@ from sklearn.metrics import r2_score
 
 def create_performance_visualization():
     # Load the public cases data
-    with open('public_cases.json', 'r') as f:
-        data = json.load(f)
+    data = as_public_cases(load_columns('public_cases.json'))
     
     # Collect all predictions vs expected with trip duration
     predictions = []
@@ -1,16 +1,34 @@
 #!/usr/bin/env python3
 
+import hashlib
 import json
 import numpy as np
-import pandas as pd
-import xgboost as xgb
-from sklearn.model_selection import cross_val_score, KFold
-from sklearn.metrics import mean_absolute_error, r2_score
+import os
 import pickle
 import sys
+from stream_io import parse_case, run_stream
+from tree_ensemble import export_booster, load_ensemble, predict_batch, predict_row, trees_metadata_path, trees_path
 
-def create_features(df):
-    """Create engineered features from the basic inputs"""
+def single_row_bins(values, bins):
+    """Bin labels pd.cut(..., bins=bins, labels=False) gives each value when cut on its own.
+
+    That is what predict_single sees for its one-row frame, so batch scoring uses
+    this to reproduce single-row predictions exactly.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    offsets = np.where(values != 0, 0.001 * np.abs(values), 0.001)
+    edges = np.linspace(values - offsets, values + offsets, bins + 1, axis=-1)
+    # right=True bins: searchsorted(side='left') counts the edges strictly below each value
+    return (edges < values[:, None]).sum(axis=1) - 1
+
+def create_features(df, row_wise_bins=False):
+    """Create engineered features from the basic inputs.
+
+    With row_wise_bins the binned features are computed per row, matching
+    what predict_single produces for each case on its own.
+    """
+    import pandas as pd
+    
     # Basic features
     features = df.copy()
     
@@ -57,29 +75,136 @@ def create_features(df):
     features['log_days'] = np.log1p(features['trip_duration_days'])
     
     # Binned features
-    features['miles_bin'] = pd.cut(features['miles_traveled'], bins=10, labels=False)
-    features['receipts_bin'] = pd.cut(features['total_receipts_amount'], bins=10, labels=False)
-    features['days_bin'] = pd.cut(features['trip_duration_days'], bins=5, labels=False)
+    if row_wise_bins:
+        features['miles_bin'] = single_row_bins(features['miles_traveled'], 10)
+        features['receipts_bin'] = single_row_bins(features['total_receipts_amount'], 10)
+        features['days_bin'] = single_row_bins(features['trip_duration_days'], 5)
+    else:
+        features['miles_bin'] = pd.cut(features['miles_traveled'], bins=10, labels=False)
+        features['receipts_bin'] = pd.cut(features['total_receipts_amount'], bins=10, labels=False)
+        features['days_bin'] = pd.cut(features['trip_duration_days'], bins=5, labels=False)
     
     return features
 
+# Binned features: (source column, number of pd.cut bins)
+BINNED_FEATURES = {
+    'miles_bin': ('miles_traveled', 10),
+    'receipts_bin': ('total_receipts_amount', 10),
+    'days_bin': ('trip_duration_days', 5),
+}
+
+def numeric_features(days, miles, receipts):
+    """The unbinned create_features columns as float64 NumPy arrays, computed the same way"""
+    days = np.asarray(days, dtype=np.float64)
+    miles = np.asarray(miles, dtype=np.float64)
+    receipts = np.asarray(receipts, dtype=np.float64)
+    
+    daily_receipts = receipts / days
+    hustle_ratio = miles / (receipts + 1)
+    return {
+        'trip_duration_days': days,
+        'miles_traveled': miles,
+        'total_receipts_amount': receipts,
+        'daily_rate': miles / days,
+        'daily_receipts': daily_receipts,
+        'miles_per_dollar': miles / (receipts + 0.01),
+        'dollars_per_mile': receipts / (miles + 0.01),
+        'is_1day': days == 1,
+        'is_2day': days == 2,
+        'is_3day': days == 3,
+        'is_4_6day': (days >= 4) & (days <= 6),
+        'is_7plus_day': days >= 7,
+        'is_long_trip': days >= 10,
+        'high_daily_spending': daily_receipts > 100,
+        'very_high_daily_spending': daily_receipts > 200,
+        'low_miles': miles < 100,
+        'high_miles': miles > 500,
+        'very_high_miles': miles > 1000,
+        'hustle_ratio': hustle_ratio,
+        'is_hustle_trip': hustle_ratio > 0.8,
+        'is_vacation_trip': hustle_ratio < 0.1,
+        'days_miles_interaction': days * miles,
+        'days_receipts_interaction': days * receipts,
+        'miles_receipts_interaction': miles * receipts,
+        'days_squared': days ** 2,
+        'miles_squared': miles ** 2,
+        'receipts_squared': receipts ** 2,
+        'daily_receipts_squared': daily_receipts ** 2,
+        'log_miles': np.log1p(miles),
+        'log_receipts': np.log1p(receipts),
+        'log_days': np.log1p(days),
+    }
+
+def fit_feature_spec(inputs, feature_names):
+    """Freeze the training batch's pd.cut bin edges and the feature column order.
+
+    The spec is plain data (lists), stored with the model so serving builds exactly
+    the features the model was trained on.
+    """
+    import pandas as pd
+    
+    bin_edges = {}
+    for name, (column, bins) in BINNED_FEATURES.items():
+        _, edges = pd.cut(inputs[column], bins=bins, labels=False, retbins=True)
+        bin_edges[name] = [float(edge) for edge in edges]
+    return {'feature_names': list(feature_names), 'bin_edges': bin_edges}
+
+def transform_features(spec, days, miles, receipts):
+    """Feature matrix in spec's column order as float32 (what XGBoost uses internally).
+
+    Binned features use the frozen training edges; values outside the training
+    range fall into the first or last bin. Without edges (models saved before specs
+    existed) each row is binned on its own, as predict_single always did.
+    """
+    columns = numeric_features(days, miles, receipts)
+    for name, (column, bins) in BINNED_FEATURES.items():
+        if spec['bin_edges'] is None:
+            columns[name] = single_row_bins(columns[column], bins)
+            continue
+        edges = np.asarray(spec['bin_edges'][name])
+        # pd.cut bins are right-closed: (edges[i], edges[i + 1]] is bin i
+        labels = np.searchsorted(edges, columns[column], side='left') - 1
+        columns[name] = np.clip(labels, 0, len(edges) - 2)
+    
+    names = spec['feature_names']
+    matrix = np.empty((len(columns['trip_duration_days']), len(names)), dtype=np.float32)
+    for j, name in enumerate(names):
+        matrix[:, j] = columns[name]
+    return matrix
+
+def serving_spec(model_data):
+    """The model's feature spec, or a row-wise binning spec for pickles saved without one"""
+    spec = model_data.get('feature_spec')
+    if spec is None:
+        spec = {'feature_names': model_data['feature_names'], 'bin_edges': None}
+    return spec
+
+def model_features(model_data, input_df, row_wise_bins=False):
+    """Features for input_df in the model's column order.
+
+    Models saved with a feature spec use the frozen bin edges; older pickles
+    fall back to create_features, where row_wise_bins picks the binning.
+    """
+    spec = model_data.get('feature_spec')
+    if spec is not None:
+        return transform_features(spec, input_df['trip_duration_days'], input_df['miles_traveled'],
+                                  input_df['total_receipts_amount'])
+    features = create_features(input_df, row_wise_bins=row_wise_bins)
+    return features.reindex(columns=model_data['feature_names'], fill_value=0)
+
 def load_and_prepare_data():
     """Load and prepare the training data"""
-    with open('public_cases.json', 'r') as f:
-        data = json.load(f)
-    
-    # Convert to DataFrame
-    rows = []
-    for case in data:
-        row = {
-            'trip_duration_days': case['input']['trip_duration_days'],
-            'miles_traveled': case['input']['miles_traveled'],
-            'total_receipts_amount': case['input']['total_receipts_amount'],
-            'reimbursement': case['expected_output']
-        }
-        rows.append(row)
-    
-    df = pd.DataFrame(rows)
+    import pandas as pd
+    from cases import load_columns, miles, receipts
+    
+    # Convert the typed columns to a DataFrame
+    columns = load_columns('public_cases.json')
+    df = pd.DataFrame({
+        'trip_duration_days': columns['days'].astype(np.int64),
+        'miles_traveled': miles(columns),
+        'total_receipts_amount': receipts(columns),
+        'reimbursement': columns['expected']
+    })
     
     # Create features
     X = create_features(df[['trip_duration_days', 'miles_traveled', 'total_receipts_amount']])
@@ -89,6 +214,10 @@ def load_and_prepare_data():
 
 def train_xgboost_model(X, y):
     """Train an XGBoost model with hyperparameter optimization"""
+    # Training-only imports stay out of prediction mode's startup
+    import pandas as pd
+    import xgboost as xgb
+    from sklearn.model_selection import cross_val_score
     
     print(f"Training XGBoost model with {X.shape[1]} features on {X.shape[0]} samples...")
     
@@ -138,6 +267,8 @@ def train_xgboost_model(X, y):
 
 def evaluate_model(model, X, y):
     """Evaluate the model performance"""
+    from sklearn.metrics import mean_absolute_error, r2_score
+    
     predictions = model.predict(X)
     
     mae = mean_absolute_error(y, predictions)
@@ -161,42 +292,152 @@ def evaluate_model(model, X, y):
     
     return predictions, mae, r2
 
-def save_model(model, feature_names):
-    """Save the trained model"""
-    model_data = {
-        'model': model,
-        'feature_names': list(feature_names)
-    }
-    
-    with open('xgboost_model.pkl', 'wb') as f:
-        pickle.dump(model_data, f)
-    print("\nModel saved as 'xgboost_model.pkl'")
+# Models are saved in XGBoost's native UBJSON format with a JSON metadata sidecar;
+# xgboost_model.pkl is still read if it is the only model present
+MODEL_PATH = 'xgboost_model.ubj'
+LEGACY_MODEL_PATH = 'xgboost_model.pkl'
+
+def metadata_path(model_path):
+    """Sidecar metadata file (feature names, bin edges, content hash) for a native model file"""
+    return os.path.splitext(model_path)[0] + '.meta.json'
 
-def predict_single(days, miles, receipts, model_path='xgboost_model.pkl'):
-    """Make a single prediction using the saved model"""
+def default_model_path():
+    """The native model if present, otherwise a legacy pickle if there is one"""
+    if not os.path.exists(MODEL_PATH) and os.path.exists(LEGACY_MODEL_PATH):
+        return LEGACY_MODEL_PATH
+    return MODEL_PATH
+
+def save_model(model, feature_names, feature_spec=None, model_path=MODEL_PATH):
+    """Save the trained booster in native format plus its metadata sidecar"""
+    model.get_booster().save_model(model_path)
     with open(model_path, 'rb') as f:
-        model_data = pickle.load(f)
-    
-    model = model_data['model']
-    feature_names = model_data['feature_names']
+        digest = hashlib.sha256(f.read()).hexdigest()
     
-    # Create single row DataFrame
-    input_df = pd.DataFrame({
-        'trip_duration_days': [days],
-        'miles_traveled': [miles],
-        'total_receipts_amount': [receipts]
-    })
+    metadata = {
+        'feature_names': list(feature_names),
+        'feature_spec': feature_spec,
+        'sha256': digest
+    }
+    with open(metadata_path(model_path), 'w') as f:
+        json.dump(metadata, f, indent=2)
     
-    # Create features
-    features = create_features(input_df)
+    # Compiled trees let prediction run on NumPy alone
+    export_booster(model.get_booster(), model_path, feature_names, digest)
+    print(f"\nModel saved as '{model_path}' (metadata in '{metadata_path(model_path)}', "
+          f"compiled trees in '{trees_path(model_path)}')")
+
+def read_native_model(model_path):
+    """Load a native model, checking it against the sidecar hash"""
+    import xgboost as xgb
     
-    # Ensure feature order matches training
-    features = features.reindex(columns=feature_names, fill_value=0)
+    with open(metadata_path(model_path), 'r') as f:
+        metadata = json.load(f)
     
-    # Predict
-    prediction = model.predict(features)[0]
+    with open(model_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    if digest != metadata['sha256']:
+        raise ValueError(f"{model_path} does not match the hash in {metadata_path(model_path)}; retrain or re-save the model")
+    booster = xgb.Booster()
+    booster.load_model(model_path)
+    
+    return {
+        'booster': booster,
+        'feature_names': metadata['feature_names'],
+        'feature_spec': metadata['feature_spec'],
+        'sha256': digest
+    }
+
+def read_compiled_model(model_path):
+    """Load the compiled trees exported from a native model, or None if missing or stale.
+
+    Neither xgboost nor the model file itself is needed: the trees record the hash
+    of the model they were exported from, which must match the metadata sidecar.
+    """
+    if not (os.path.exists(trees_path(model_path)) and os.path.exists(trees_metadata_path(model_path))):
+        return None
+    with open(metadata_path(model_path), 'r') as f:
+        metadata = json.load(f)
+    ensemble = load_ensemble(model_path)
+    if ensemble['source_sha256'] != metadata['sha256']:
+        return None
+    
+    return {
+        'booster': None,
+        'ensemble': ensemble,
+        'feature_names': metadata['feature_names'],
+        'feature_spec': metadata['feature_spec'],
+        'sha256': metadata['sha256']
+    }
+
+def read_pickled_model(model_path):
+    """Load a legacy pickle of the sklearn wrapper and feature names"""
+    with open(model_path, 'rb') as f:
+        payload = f.read()
+    model_data = pickle.loads(payload)
+    return {
+        'booster': model_data['model'].get_booster(),
+        'feature_names': model_data['feature_names'],
+        'feature_spec': model_data.get('feature_spec'),
+        'sha256': hashlib.sha256(payload).hexdigest()
+    }
+
+# Loaded models keyed by path, so long-lived processes (prediction_daemon.py) only load once
+_model_cache = {}
+
+def load_model_data(model_path=None, compiled=True):
+    """Load the saved model, reusing the cached copy unless its files have changed.
+
+    Returns a dict with the booster (None when the compiled trees are used), the
+    compiled ensemble if any, feature names, feature spec and content hash.
+    compiled=False always loads the XGBoost booster.
+    """
+    model_path = model_path or default_model_path()
+    legacy = model_path.endswith('.pkl')
+    files = [model_path] if legacy else [model_path, metadata_path(model_path),
+                                         trees_path(model_path), trees_metadata_path(model_path)]
+    mtimes = tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in files)
+    
+    key = (model_path, compiled)
+    cached = _model_cache.get(key)
+    if cached is None or cached[0] != mtimes:
+        if legacy:
+            model_data = read_pickled_model(model_path)
+        else:
+            model_data = (compiled and read_compiled_model(model_path)) or read_native_model(model_path)
+        cached = (mtimes, model_data)
+        _model_cache[key] = cached
+    return cached[1]
+
+def predict_features(model_data, features):
+    """Raw float32 predictions for a feature matrix, from the compiled trees when available"""
+    ensemble = model_data.get('ensemble')
+    if ensemble is None:
+        return model_data['booster'].inplace_predict(features)
+    if len(features) == 1:
+        return np.atleast_1d(predict_row(ensemble, features[0]))
+    return predict_batch(ensemble, features)
+
+def predict_single(days, miles, receipts, model_path=None):
+    """Make a single prediction using the saved model.
+
+    Goes straight from the scalars to a float32 feature row and the compiled trees
+    (or the booster's in-place prediction), without a DataFrame or the sklearn wrapper.
+    """
+    model_data = load_model_data(model_path)
+    features = transform_features(serving_spec(model_data), [days], [miles], [receipts])
+    prediction = predict_features(model_data, features)[0]
     return round(prediction, 2)
 
+def predict_chunk(cases, model_path=None):
+    """Predict a list of (days, miles, receipts) cases, formatted exactly like predict_single's output"""
+    model_data = load_model_data(model_path)
+    
+    days, miles, receipts = zip(*cases)
+    features = transform_features(serving_spec(model_data), days, miles, receipts)
+    
+    predictions = predict_features(model_data, features)
+    return [str(round(prediction, 2)) for prediction in predictions]
+
 def analyze_worst_cases(model, X, y, df, top_n=10):
     """Analyze the worst prediction cases"""
     predictions = model.predict(X)
@@ -218,9 +459,12 @@ def analyze_worst_cases(model, X, y, df, top_n=10):
 if __name__ == "__main__":
     if len(sys.argv) == 4:
         # Prediction mode for run.sh
-        days, miles, receipts = int(sys.argv[1]), int(sys.argv[2]), float(sys.argv[3])
+        days, miles, receipts = parse_case(*sys.argv[1:])
         result = predict_single(days, miles, receipts)
         print(result)
+    elif sys.argv[1:] == ['--stream']:
+        # Batch mode: 'days miles receipts' (or JSON) lines on stdin, one prediction per line on stdout
+        run_stream(predict_chunk)
     else:
         # Training mode
         print("🤖 XGBoost Reimbursement System Training")
@@ -240,8 +484,15 @@ if __name__ == "__main__":
         # Analyze worst cases
         analyze_worst_cases(model, X, y, df)
         
+        # Freeze bin edges and column order so serving builds the training features
+        feature_spec = fit_feature_spec(df, X.columns)
+        frozen = transform_features(feature_spec, df['trip_duration_days'], df['miles_traveled'],
+                                    df['total_receipts_amount'])
+        if not np.array_equal(frozen, X.to_numpy(dtype=np.float32)):
+            raise RuntimeError("Frozen feature transform does not reproduce the training features")
+        
         # Save model
-        save_model(model, X.columns)
+        save_model(model, X.columns, feature_spec)
         
         print(f"\n🎯 XGBoost model trained! Average error: ${mae:.2f}")
         print("Run './eval.sh' to test with the challenge evaluation script.") 
\ No newline at end of file